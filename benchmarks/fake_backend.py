@@ -0,0 +1,195 @@
+"""Локальная замена backend API для нагрузочного тестирования
+
+Запуск отдельно: python -m benchmarks.fake_backend --port 8000
+Покрывает все эндпоинты, которые вызывает APIClient. Задержка ответа
+и объем данных настраиваются. GET ответы несут ETag и поддерживают
+условные запросы (If-None-Match -> 304).
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+from collections import Counter
+from datetime import date, timedelta
+
+from aiohttp import web
+
+# Первый tg_id сгенерированных сотрудников; сотрудник i привязан к TG_ID_BASE + i
+TG_ID_BASE = 1000
+PASSWORD = "password"
+
+
+class FakeBackend:
+    def __init__(
+            self,
+            employees: int = 100,
+            actions_per_employee: int = 200,
+            document_size: int = 50 * 1024,
+            latency: float = 0.005,
+            jitter: float = 0.0
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.document = b"\xd0\xcf\x11\xe0" + b"0" * max(0, document_size - 4)
+        self.calls = Counter()
+        # Байт JSON в телах ответов (для оценки трафика)
+        self.bytes_sent = 0
+
+        self.employees = {}
+        self.actions = {}
+        action_id = 1
+        start = date.today() - timedelta(days=3 * 365)
+        for employee_id in range(1, employees + 1):
+            self.employees[employee_id] = {
+                "employee_id": employee_id,
+                "surname": f"Фамилия{employee_id}",
+                "name": f"Имя{employee_id}",
+                "patronymic": f"Отчество{employee_id}",
+                "login": f"user{employee_id}",
+                "role_id": 1 if employee_id == 1 else 2,
+                "tg_id": TG_ID_BASE + employee_id,
+                "idle_hours": employee_id % 40,
+                "post": {"post_id": employee_id % 5 + 1, "name_post": f"Должность {employee_id % 5 + 1}"},
+                "otdel": {"otdel_id": employee_id % 7 + 1, "name_otdel": f"Отдел {employee_id % 7 + 1}"},
+            }
+            actions = []
+            for i in range(actions_per_employee):
+                actiontype_id = 1 if i % 4 == 0 else 2
+                actions.append({
+                    "action_id": action_id,
+                    "employee_id": employee_id,
+                    "date_action": (start + timedelta(days=i * 1095 // max(1, actions_per_employee))).isoformat(),
+                    "hours": 8 if actiontype_id == 1 else random.randint(1, 6),
+                    "actiontype_id": actiontype_id,
+                    "action_type_name": "Выходной" if actiontype_id == 1 else "Переработка",
+                })
+                action_id += 1
+            self.actions[employee_id] = actions
+        self.next_action_id = action_id
+
+    async def _delay(self, route: str):
+        self.calls[route] += 1
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _json(self, request: web.Request, data) -> web.Response:
+        """JSON ответ с ETag; 304 без тела, если у клиента актуальная версия"""
+        body = json.dumps(data, ensure_ascii=False).encode()
+        etag = '"' + hashlib.blake2s(body, digest_size=8).hexdigest() + '"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        self.bytes_sent += len(body)
+        return web.Response(body=body, content_type="application/json", headers={"ETag": etag})
+
+    def _employee_or_404(self, request: web.Request) -> dict:
+        employee = self.employees.get(int(request.match_info["employee_id"]))
+        if employee is None:
+            raise web.HTTPNotFound()
+        return employee
+
+    async def login(self, request: web.Request) -> web.Response:
+        await self._delay("POST /employees/login")
+        body = await request.json()
+        for employee in self.employees.values():
+            if employee["login"] == body.get("login") and body.get("password") == PASSWORD:
+                return web.json_response(employee)
+        raise web.HTTPNotFound()
+
+    async def set_tg_id(self, request: web.Request) -> web.Response:
+        await self._delay("PUT /employees/{id}/set_tg_id")
+        employee = self._employee_or_404(request)
+        employee["tg_id"] = (await request.json()).get("tg_id")
+        return web.json_response(employee)
+
+    async def unset_tg_id(self, request: web.Request) -> web.Response:
+        await self._delay("PUT /employees/{id}/unset_tg_id")
+        employee = self._employee_or_404(request)
+        employee["tg_id"] = None
+        return web.json_response(employee)
+
+    async def by_tg_id(self, request: web.Request) -> web.Response:
+        await self._delay("GET /employees/telegram/{id}")
+        tg_id = int(request.match_info["tg_id"])
+        for employee in self.employees.values():
+            if employee["tg_id"] == tg_id:
+                return self._json(request, employee)
+        raise web.HTTPNotFound()
+
+    async def employee(self, request: web.Request) -> web.Response:
+        await self._delay("GET /employees/{id}")
+        return self._json(request, self._employee_or_404(request))
+
+    async def employee_actions(self, request: web.Request) -> web.Response:
+        await self._delay("GET /employees/{id}/actions")
+        employee = self._employee_or_404(request)
+        return self._json(request, self.actions[employee["employee_id"]])
+
+    async def all_employees(self, request: web.Request) -> web.Response:
+        await self._delay("GET /employees")
+        return self._json(request, list(self.employees.values()))
+
+    async def create_action(self, request: web.Request) -> web.Response:
+        await self._delay("POST /actions")
+        body = await request.json()
+        actions = self.actions.setdefault(body["employee_id"], [])
+        action = dict(body, action_id=self.next_action_id, action_type_name="Переработка")
+        self.next_action_id += 1
+        actions.append(action)
+        return web.json_response(action, status=201)
+
+    async def holiday_document(self, request: web.Request) -> web.Response:
+        await self._delay("POST /documents/holiday/{id}")
+        return web.Response(body=self.document, content_type="application/msword")
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/employees/login", self.login)
+        app.router.add_put("/employees/{employee_id:\\d+}/set_tg_id", self.set_tg_id)
+        app.router.add_put("/employees/{employee_id:\\d+}/unset_tg_id", self.unset_tg_id)
+        app.router.add_get("/employees/telegram/{tg_id:\\d+}", self.by_tg_id)
+        app.router.add_get("/employees/{employee_id:\\d+}/actions", self.employee_actions)
+        app.router.add_get("/employees/{employee_id:\\d+}", self.employee)
+        app.router.add_get("/employees", self.all_employees)
+        app.router.add_post("/actions", self.create_action)
+        app.router.add_post("/documents/holiday/{action_id:\\d+}", self.holiday_document)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> web.AppRunner:
+        """Запуск сервера; фактический адрес - в self.url"""
+        runner = web.AppRunner(self.app())
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        bound_port = runner.addresses[0][1]
+        self.url = f"http://{host}:{bound_port}"
+        return runner
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--employees", type=int, default=100)
+    parser.add_argument("--actions", type=int, default=200, help="действий на сотрудника")
+    parser.add_argument("--document-size", type=int, default=50 * 1024)
+    parser.add_argument("--latency", type=float, default=0.005, help="задержка ответа, с")
+    parser.add_argument("--jitter", type=float, default=0.0, help="случайная добавка к задержке, с")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_arguments(parser)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    backend = FakeBackend(args.employees, args.actions, args.document_size, args.latency, args.jitter)
+    runner = await backend.start(args.host, args.port)
+    print(f"Fake backend listening on {backend.url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,67 @@
+"""Сравнение накладных расходов хранилищ FSM на одно обновление
+
+Запуск: python -m benchmarks.fsm_storage [--users N] [--updates N]
+
+Каждое "обновление" повторяет то, что делает диспетчер и хендлеры
+формы авторизации: чтение состояния, чтение данных, запись данных и
+смена состояния.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from bot.states.forms import AuthForm
+from bot.storage.sqlite import SQLiteStorage
+
+
+async def run_updates(storage, users: int, updates: int) -> float:
+    """Возвращает среднее время одного обновления в микросекундах"""
+    keys = [StorageKey(bot_id=1, chat_id=user_id, user_id=user_id) for user_id in range(users)]
+    started = time.perf_counter()
+    for i in range(updates):
+        key = keys[i % users]
+        await storage.get_state(key)
+        data = await storage.get_data(key)
+        data["login"] = f"user{i}"
+        await storage.set_data(key, data)
+        await storage.set_state(key, AuthForm.password if i % 2 else AuthForm.login)
+    elapsed = time.perf_counter() - started
+    return elapsed / updates * 1e6
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--updates", type=int, default=100000)
+    args = parser.parse_args()
+
+    memory = MemoryStorage()
+    memory_us = await run_updates(memory, args.users, args.updates)
+    await memory.close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite = SQLiteStorage(os.path.join(tmp, "fsm.sqlite3"))
+        sqlite_us = await run_updates(sqlite, args.users, args.updates)
+        flush_started = time.perf_counter()
+        await sqlite.close()
+        flush_ms = (time.perf_counter() - flush_started) * 1000
+
+        # Холодный старт: состояния читаются из базы
+        sqlite = SQLiteStorage(os.path.join(tmp, "fsm.sqlite3"))
+        cold_us = await run_updates(sqlite, args.users, args.users)
+        await sqlite.close()
+
+    print(f"users={args.users} updates={args.updates}")
+    print(f"MemoryStorage:        {memory_us:8.2f} us/update")
+    print(f"SQLiteStorage (warm): {sqlite_us:8.2f} us/update ({sqlite_us / memory_us:.1f}x)")
+    print(f"SQLiteStorage (cold): {cold_us:8.2f} us/update (first access per user)")
+    print(f"SQLiteStorage final flush on close: {flush_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,195 @@
+"""Нагрузочный тест бота без Telegram и backend
+
+Запуск: python -m benchmarks.load_test [--updates N] [--concurrency N] ...
+
+Поднимает FakeBackend, собирает настоящий Dispatcher через
+create_dispatcher (как main.py) и подает в него синтетические
+обновления Message/CallbackQuery. Запросы к Telegram Bot API
+перехватываются фиктивной сессией. Выводит обновления в секунду,
+p50/p99 задержки и число обращений к backend на обновление.
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import SendDocument, TelegramMethod
+from aiogram.types import Chat, Document, Message
+
+from benchmarks.fake_backend import FakeBackend, TG_ID_BASE, add_arguments
+from bot.config import Config
+from bot.dispatcher import create_dispatcher
+from bot.middlewares.latency_middleware import percentile
+from bot.models import Action
+from bot.services.documents import document_version
+
+FAKE_TOKEN = "123456789:AAHdqTcvCH1vGWJxfSeofSAs0K5PALDsaw"
+
+MENU_TEXTS = ["📊 Мои действия", "⏰ Мои часы", "📅 Мои выходные", "👤 Профиль", "/help", "/stats"]
+
+
+class FakeTelegramSession(BaseSession):
+    """Сессия Bot API, отвечающая правдоподобными объектами без сети"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = Counter()
+        self._message_ids = itertools.count(1)
+
+    async def make_request(self, bot: Bot, method: TelegramMethod, timeout=None):
+        self.calls[type(method).__name__] += 1
+        if method.__returning__ is bool:
+            return True
+        message_id = next(self._message_ids)
+        document = None
+        if isinstance(method, SendDocument):
+            document = Document(file_id=f"file-{message_id}", file_unique_id=f"file-{message_id}")
+        return Message(
+            message_id=message_id,
+            date=datetime.now(timezone.utc),
+            chat=Chat(id=getattr(method, "chat_id", None) or 0, type="private"),
+            document=document,
+        )
+
+    async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True):
+        yield b""
+
+    async def close(self):
+        pass
+
+
+class UpdateFactory:
+    """Генератор синтетических обновлений от привязанных сотрудников"""
+
+    def __init__(self, backend: FakeBackend, documents_share: float, callbacks_share: float):
+        self.backend = backend
+        self.documents_share = documents_share
+        self.callbacks_share = callbacks_share
+        self._update_ids = itertools.count(1)
+
+    def _user(self, employee_id: int) -> dict:
+        return {"id": TG_ID_BASE + employee_id, "is_bot": False, "first_name": f"User{employee_id}"}
+
+    def _message(self, employee_id: int, text: str) -> dict:
+        update_id = next(self._update_ids)
+        return {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": TG_ID_BASE + employee_id, "type": "private"},
+            "from": self._user(employee_id),
+            "text": text,
+        }
+
+    def make(self) -> dict:
+        employee_id = random.randint(1, len(self.backend.employees))
+        roll = random.random()
+        if roll < self.documents_share + self.callbacks_share:
+            if roll < self.documents_share:
+                days_off = [a for a in self.backend.actions[employee_id] if a["actiontype_id"] == 1]
+                action = random.choice(days_off)
+                data = f"d:{action['action_id']}:{document_version(Action.from_dict(action))}"
+            else:
+                data = random.choice(["ap:1", "ap:2", "dp:1"])
+            update_id = next(self._update_ids)
+            return {"update_id": update_id, "callback_query": {
+                "id": str(update_id),
+                "from": self._user(employee_id),
+                "chat_instance": str(employee_id),
+                "message": self._message(employee_id, "menu"),
+                "data": data,
+            }}
+
+        text = random.choice(MENU_TEXTS)
+        message = self._message(employee_id, text)
+        if text.startswith("/"):
+            message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text)}]
+        return {"update_id": message["message_id"], "message": message}
+
+
+async def run(args):
+    backend = FakeBackend(args.employees, args.actions, args.document_size, args.latency, args.jitter)
+    backend_runner = await backend.start()
+
+    tmp = tempfile.TemporaryDirectory()
+    Config.API_URL = backend.url
+    Config.DB_PATH = f"{tmp.name}/bot_state.sqlite3"
+    Config.FSM_STORAGE = args.storage
+    Config.FSM_STORAGE_PATH = f"{tmp.name}/bot_fsm.sqlite3"
+    Config.LATENCY_REPORT_EVERY = 0
+    Config.API_HTTP_CACHE_SIZE = args.http_cache
+    if not args.throttle:
+        Config.THROTTLE_DEFAULT_RATE = Config.THROTTLE_REPORT_RATE = Config.THROTTLE_DOCUMENT_RATE = 1e9
+        Config.THROTTLE_DEFAULT_BURST = Config.THROTTLE_REPORT_BURST = Config.THROTTLE_DOCUMENT_BURST = 1e9
+
+    # Диспетчер собирается так же, как в main.py, с настройками выше
+    session = FakeTelegramSession()
+    bot = Bot(token=FAKE_TOKEN, session=session)
+    dp = await create_dispatcher(digest=False)
+    workflow_data = {"dispatcher": dp, "bot": bot, **dp.workflow_data}
+    await dp.emit_startup(**workflow_data)
+
+    factory = UpdateFactory(backend, args.documents, args.callbacks)
+    updates = [factory.make() for _ in range(args.warmup + args.updates)]
+    latencies = []
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def feed(update: dict, record: bool):
+        async with semaphore:
+            started = time.perf_counter()
+            await dp.feed_raw_update(bot, update)
+            if record:
+                latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(feed(update, False) for update in updates[:args.warmup]))
+    backend.calls.clear()
+    backend.bytes_sent = 0
+    session.calls.clear()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(feed(update, True) for update in updates[args.warmup:]))
+    elapsed = time.perf_counter() - started
+
+    await dp.emit_shutdown(**workflow_data)
+    await backend_runner.cleanup()
+    tmp.cleanup()
+
+    backend_calls = sum(backend.calls.values())
+    print(f"updates={args.updates} concurrency={args.concurrency} employees={args.employees} "
+          f"actions/employee={args.actions} backend latency={args.latency * 1000:.1f}ms")
+    print(f"throughput: {args.updates / elapsed:.1f} updates/s")
+    print(f"latency:    p50={percentile(latencies, 0.5) * 1000:.2f}ms "
+          f"p99={percentile(latencies, 0.99) * 1000:.2f}ms max={max(latencies) * 1000:.2f}ms")
+    print(f"backend:    {backend_calls / args.updates:.3f} calls/update")
+    for route, count in backend.calls.most_common():
+        print(f"  {route}: {count}")
+    print(f"backend JSON: {backend.bytes_sent / 1024:.1f} KiB")
+    print(f"telegram:   {sum(session.calls.values()) / args.updates:.3f} calls/update")
+    for method, count in session.calls.most_common():
+        print(f"  {method}: {count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--documents", type=float, default=0.05, help="доля запросов справок")
+    parser.add_argument("--callbacks", type=float, default=0.15, help="доля нажатий навигации")
+    parser.add_argument("--storage", default="memory", choices=["memory", "sqlite"])
+    parser.add_argument("--throttle", action="store_true", help="не отключать ограничение частоты")
+    parser.add_argument("--http-cache", type=int, default=0, help="размер HTTP кэша APIClient, байт")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,77 @@
+import asyncio
+import json
+import random
+import re
+import time
 import aiohttp
-from typing import Optional, Dict, Any, List
+from functools import partial
+from typing import Optional, Dict, Any, List, Set, Tuple, Callable, Awaitable
 import logging
 
+from bot.config import Config
+from bot.exceptions import APIError, APIUnavailableError, CircuitOpenError, DocumentTooLargeError
+from bot.metrics import API_COALESCED, API_INFLIGHT, API_REQUEST_DURATION
+from bot.models import Action, Employee
+from bot.services.circuit_breaker import CircuitBreaker
+from bot.services.http_cache import CachedResponse, HTTPCache, cacheable
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson необязателен
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Декодер JSON по умолчанию: orjson, если установлен, иначе стандартный json
+default_json_loads: Callable[[bytes], Any] = orjson.loads if orjson is not None else json.loads
+
+# Результат чтения 304 без сохраненного ответа: запрос повторяется без валидаторов
+NOT_MODIFIED = object()
+VALIDATOR_HEADERS = ("If-None-Match", "If-Modified-Since")
+
 
 class APIClient:
-    def __init__(self, base_url: str):
+    # Методы, одинаковые запросы которых можно объединять
+    COALESCED_METHODS = frozenset({"GET"})
+    # Методы, которые безопасно повторять при сбоях
+    IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+    # Коды ответа, при которых backend считается недоступным
+    UNAVAILABLE_STATUSES = frozenset({500, 502, 503, 504})
+
+    def __init__(self, base_url: str, json_loads: Optional[Callable[[bytes], Any]] = None,
+                 http_cache: Optional[HTTPCache] = None):
         self.base_url = base_url
+        self.json_loads = json_loads or default_json_loads
+        # Кэш GET ответов с условными запросами; None - отключен
+        self.http_cache = http_cache
         self.session: Optional[aiohttp.ClientSession] = None
+        # Выполняющиеся GET запросы: ключ -> задача с результатом
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+
+        self.timeout = aiohttp.ClientTimeout(total=Config.API_TIMEOUT, connect=Config.API_CONNECT_TIMEOUT)
+        # Таймауты для отдельных эндпоинтов (по шаблону пути)
+        self.endpoint_timeouts: Dict[str, aiohttp.ClientTimeout] = {
+            "/documents/holiday/{id}": aiohttp.ClientTimeout(
+                total=Config.API_DOCUMENT_TIMEOUT, connect=Config.API_CONNECT_TIMEOUT
+            ),
+        }
+        self.retries = Config.API_RETRIES
+        self.max_document_size = Config.DOCUMENT_MAX_SIZE
+        self.breaker = CircuitBreaker(
+            failure_threshold=Config.API_BREAKER_THRESHOLD,
+            reset_timeout=Config.API_BREAKER_RESET_TIMEOUT,
+        )
 
     async def create_session(self):
         """Создание aiohttp сессии"""
         if not self.session:
-            self.session = aiohttp.ClientSession()
+            connector = aiohttp.TCPConnector(
+                limit=Config.API_POOL_SIZE,
+                limit_per_host=Config.API_POOL_SIZE_PER_HOST,
+                ttl_dns_cache=Config.API_DNS_CACHE_TTL,
+                keepalive_timeout=Config.API_KEEPALIVE_TIMEOUT,
+            )
+            self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
 
     async def close_session(self):
         """Закрытие сессии"""
@@ -22,28 +80,222 @@ class APIClient:
             self.session = None
 
     async def _request(self, method: str, endpoint: str, **kwargs) -> Optional[Dict[Any, Any]]:
-        """Базовый метод для запросов"""
+        """Базовый метод для запросов
+
+        Одинаковые GET запросы, выполняющиеся одновременно, разделяют
+        один HTTP запрос и его результат. С HTTP кэшем свежий ответ
+        отдается без запроса, остальные проверяются условным запросом;
+        запросы на изменение сбрасывают ответы связанных ресурсов.
+        """
+        if method not in self.COALESCED_METHODS or "json" in kwargs or "data" in kwargs:
+            try:
+                return await self._send(method, endpoint, **kwargs)
+            finally:
+                # Уже идущие GET запросы могли начаться до изменения: новые
+                # запросы к ним не присоединяются (с кэшем и без него)
+                self._inflight.clear()
+                if self.http_cache is not None:
+                    self.http_cache.invalidate_tags(self._related_tags(endpoint, kwargs.get("json")))
+
+        key = self._flight_key(method, endpoint, kwargs)
+        if self.http_cache is not None:
+            entry = self.http_cache.get(key)
+            if entry is not None and entry.fresh():
+                self.http_cache.hits += 1
+                return entry.value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            API_COALESCED.inc(self._route(endpoint))
+        else:
+            task = asyncio.ensure_future(self._fetch(method, endpoint, key, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget_flight(key, t))
+        # shield: отмена одного ожидающего не отменяет запрос для остальных
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def _flight_key(method: str, endpoint: str, kwargs: Dict[str, Any]) -> Tuple:
+        params = kwargs.get("params") or {}
+        return method, endpoint, tuple(sorted(params.items())), tuple(sorted(
+            (k, repr(v)) for k, v in kwargs.items() if k != "params"
+        ))
+
+    def _forget_flight(self, key: Tuple, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Ошибка считается обработанной, даже если все ожидающие были отменены
+        if not task.cancelled():
+            task.exception()
+
+    async def _fetch(self, method: str, endpoint: str, key: Tuple, **kwargs) -> Any:
+        """GET запрос, условный, если ответ уже есть в HTTP кэше"""
+        if self.http_cache is None:
+            return await self._send(method, endpoint, **kwargs)
+
+        headers = kwargs.pop("headers", None) or {}
+        generation = self.http_cache.generation
+        entry = self.http_cache.get(key)
+        validators = entry.validators() if entry is not None else {}
+        read = partial(self._read_cached, key, endpoint, entry, generation)
+        result = await self._send(method, endpoint, read=read, headers={**headers, **validators}, **kwargs)
+        if result is not NOT_MODIFIED:
+            return result
+
+        # 304 без ответа в кэше (валидаторы переданы вызывающим): нужен полный ответ
+        headers = {name: value for name, value in headers.items() if name not in VALIDATOR_HEADERS}
+        read = partial(self._read_cached, key, endpoint, None, generation)
+        result = await self._send(method, endpoint, read=read, headers=headers, **kwargs)
+        if result is NOT_MODIFIED:
+            logger.error(f"API Error: 304 without a cached response - {method} {endpoint}")
+            return None
+        return result
+
+    async def _read_cached(self, key: Tuple, endpoint: str, entry: Optional[CachedResponse], generation: int,
+                           response: aiohttp.ClientResponse) -> Any:
+        """Ответ из кэша при 304, иначе декодирование тела и сохранение в кэш"""
+        cache = self.http_cache
+        if response.status == 304:
+            if entry is None:
+                return NOT_MODIFIED
+            cache.hits += 1
+            cache.revalidated += 1
+            entry.update(response.headers)
+            return entry.value
+
+        body = await response.read()
+        value = self.json_loads(body)
+        cache.misses += 1
+        if cacheable(response.headers) and cache.generation == generation:
+            entry = CachedResponse(value, len(body), self._resource_tags(endpoint, value))
+            entry.update(response.headers)
+            cache.set(key, entry)
+        return value
+
+    @staticmethod
+    def _resource_tags(endpoint: str, value: Any = None) -> Set[str]:
+        """Теги закэшированного ответа: ресурс /name/{id} или коллекция /name
+
+        Ответ с employee_id (например, поиск по tg_id) дополнительно
+        помечается ресурсом сотрудника.
+        """
+        parts = endpoint.strip("/").split("/")
+        if len(parts) > 1 and parts[1].isdigit():
+            tags = {f"/{parts[0]}/{parts[1]}"}
+        else:
+            tags = {f"/{parts[0]}"}
+        if isinstance(value, dict) and value.get("employee_id") is not None:
+            tags.add(f"/employees/{value['employee_id']}")
+        return tags
+
+    @staticmethod
+    def _related_tags(endpoint: str, payload: Any = None) -> Set[str]:
+        """Теги, которые сбрасывает запрос на изменение
+
+        Изменение ресурса затрагивает и его коллекцию; изменение с
+        employee_id в теле - только этого сотрудника (его карточку и
+        действия), без списка всех сотрудников: иначе пакетное
+        оформление сбрасывало бы список на каждой строке.
+        """
+        parts = endpoint.strip("/").split("/")
+        tags = {f"/{parts[0]}"}
+        if len(parts) > 1 and parts[1].isdigit():
+            tags.add(f"/{parts[0]}/{parts[1]}")
+        if isinstance(payload, dict) and payload.get("employee_id") is not None:
+            tags.add(f"/employees/{payload['employee_id']}")
+        return tags
+
+    @staticmethod
+    def _route(endpoint: str) -> str:
+        """Шаблон эндпоинта: числовые сегменты пути заменяются на {id}"""
+        return re.sub(r"/\d+(?=/|$)", "/{id}", endpoint)
+
+    def _backoff(self, attempt: int) -> float:
+        """Задержка перед повтором: экспоненциальная с полным джиттером"""
+        cap = min(Config.API_RETRY_BACKOFF_MAX, Config.API_RETRY_BACKOFF * 2 ** attempt)
+        return random.uniform(0, cap)
+
+    async def _send(
+            self,
+            method: str,
+            endpoint: str,
+            read: Callable[[aiohttp.ClientResponse], Awaitable[Any]] = None,
+            **kwargs
+    ) -> Any:
+        """Выполнение HTTP запроса с повторами и автоматом размыкания
+
+        Возвращает None, если ресурс не найден или запрос отклонен (4xx).
+        Если backend недоступен, выбрасывает APIUnavailableError.
+        """
         url = f"{self.base_url}{endpoint}"
+        route = self._route(endpoint)
+        if "timeout" not in kwargs and route in self.endpoint_timeouts:
+            kwargs["timeout"] = self.endpoint_timeouts[route]
+        attempts = 1 + (self.retries if method in self.IDEMPOTENT_METHODS else 0)
+
+        for attempt in range(attempts):
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"Backend unavailable, circuit open: {method} {route}")
+            try:
+                result = await self._attempt(method, url, route, read, **kwargs)
+            except APIUnavailableError as e:
+                # Одна ошибка на логический запрос; пробный запрос (HALF_OPEN) не повторяется
+                if attempt + 1 >= attempts or self.breaker.state != CircuitBreaker.CLOSED:
+                    self.breaker.record_failure()
+                    logger.error(f"Request error: {method} {route} - {e}")
+                    raise
+                logger.warning(f"Retrying {method} {route} after error: {e}")
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+            except APIError:
+                # Backend ответил, ошибка на стороне клиента (например, слишком большой файл)
+                self.breaker.record_success()
+                raise
+            except BaseException:
+                # Отмена или непредвиденная ошибка: пробный запрос не должен остаться занятым
+                self.breaker.release()
+                raise
+            self.breaker.record_success()
+            return result
+
+    async def _attempt(self, method: str, url: str, route: str, read=None, **kwargs) -> Any:
+        """Одна попытка запроса"""
+        status = "error"
+        started = time.perf_counter()
+        API_INFLIGHT.inc()
         try:
             async with self.session.request(method, url, **kwargs) as response:
-                if response.status in [200, 201]:
-                    return await response.json()
+                status = str(response.status)
+                # 304 бывает только в ответ на условный запрос, его разбирает read
+                if response.status in [200, 201] or (response.status == 304 and read is not None):
+                    if read is not None:
+                        return await read(response)
+                    # Тело декодируется из байтов, без промежуточной строки
+                    return self.json_loads(await response.read())
                 elif response.status == 404:
                     return None
+                elif response.status in self.UNAVAILABLE_STATUSES:
+                    raise APIUnavailableError(
+                        f"API Error: {response.status} - {await response.text()}",
+                        status=response.status,
+                    )
                 else:
                     logger.error(f"API Error: {response.status} - {await response.text()}")
                     return None
-        except Exception as e:
-            logger.error(f"Request error: {e}")
-            return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise APIUnavailableError(f"{type(e).__name__}: {e}") from e
+        finally:
+            API_INFLIGHT.dec()
+            API_REQUEST_DURATION.observe(time.perf_counter() - started, method, route, status)
 
     # === Авторизация ===
-    async def login(self, login: str, password: str) -> Optional[Dict]:
+    async def login(self, login: str, password: str) -> Optional[Employee]:
         """Авторизация по логину и паролю"""
-        return await self._request("POST", "/employees/login", json={
+        data = await self._request("POST", "/employees/login", json={
             "login": login,
             "password": password
         })
+        return Employee.from_dict(data) if data else None
 
     async def link_telegram(self, employee_id: int, tg_id: int) -> bool:
         """Привязка Telegram ID к сотруднику"""
@@ -52,9 +304,10 @@ class APIClient:
         })
         return result is not None
 
-    async def get_employee_by_tg_id(self, tg_id: int) -> Optional[Dict]:
+    async def get_employee_by_tg_id(self, tg_id: int) -> Optional[Employee]:
         """Получить сотрудника по Telegram ID"""
-        return await self._request("GET", f"/employees/telegram/{tg_id}")
+        data = await self._request("GET", f"/employees/telegram/{tg_id}")
+        return Employee.from_dict(data) if data else None
 
     async def unlink_telegram(self, employee_id: int) -> bool:
         """Отвязать Telegram ID"""
@@ -64,18 +317,25 @@ class APIClient:
         return result is not None
 
     # === Действия сотрудника ===
-    async def get_employee_actions(self, employee_id: int) -> Optional[List[Dict]]:
+    async def get_employee_actions(self, employee_id: int) -> Optional[List[Action]]:
         """Получить все действия сотрудника"""
-        return await self._request("GET", f"/employees/{employee_id}/actions")
+        data = await self._request("GET", f"/employees/{employee_id}/actions")
+        if data is None:
+            return None
+        return [Action.from_dict(item) for item in data]
 
-    async def get_employee_info(self, employee_id: int) -> Optional[Dict]:
+    async def get_employee_info(self, employee_id: int) -> Optional[Employee]:
         """Получить информацию о сотруднике"""
-        return await self._request("GET", f"/employees/{employee_id}")
+        data = await self._request("GET", f"/employees/{employee_id}")
+        return Employee.from_dict(data) if data else None
 
     # === Администраторские функции ===
-    async def get_all_employees(self) -> Optional[List[Dict]]:
+    async def get_all_employees(self) -> Optional[List[Employee]]:
         """Получить список всех сотрудников"""
-        return await self._request("GET", "/employees")
+        data = await self._request("GET", "/employees")
+        if data is None:
+            return None
+        return [Employee.from_dict(item) for item in data]
 
     async def create_overtime(self, employee_id: int, hours: int, date: str, actiontype_id: int = 1) -> Optional[Dict]:
         """Создать запись о переработке"""
@@ -91,18 +351,23 @@ class APIClient:
         return await self._request_binary("POST", f"/documents/holiday/{action_id}")
 
     async def _request_binary(self, method: str, endpoint: str) -> Optional[bytes]:
-        """Запрос для получения бинарных данных (файла)"""
-        url = f"{self.base_url}{endpoint}"
-        print(url)
-        try:
-            async with self.session.request(method, url) as response:
-                if response.status == 200:
-                    return await response.read()
-                elif response.status == 404:
-                    return None
-                else:
-                    logger.error(f"API Error: {response.status} - {await response.text()}")
-                    return None
-        except Exception as e:
-            logger.error(f"Request error: {e}")
-            return None
\ No newline at end of file
+        """Запрос для получения бинарных данных (файла)
+
+        Тело читается частями с проверкой максимального размера.
+        """
+        logger.debug(f"Binary request: {method} {endpoint}")
+        return await self._send(method, endpoint, read=self._read_limited)
+
+    async def _read_limited(self, response: aiohttp.ClientResponse) -> bytes:
+        """Чтение тела ответа частями, не больше max_document_size байт"""
+        if response.content_length is not None and response.content_length > self.max_document_size:
+            raise DocumentTooLargeError(
+                f"Document too large: {response.content_length} > {self.max_document_size} bytes"
+            )
+
+        buffer = bytearray()
+        async for chunk in response.content.iter_chunked(Config.DOCUMENT_CHUNK_SIZE):
+            buffer += chunk
+            if len(buffer) > self.max_document_size:
+                raise DocumentTooLargeError(f"Document too large: more than {self.max_document_size} bytes")
+        return bytes(buffer)
@@ -5,4 +5,116 @@ load_dotenv()
 
 class Config:
     BOT_TOKEN = os.environ.get('BOT_TOKEN')
-    API_URL = os.environ.get('API_URL')
\ No newline at end of file
+    API_URL = os.environ.get('API_URL')
+
+    # Кэш сотрудников по tg_id в AuthMiddleware
+    EMPLOYEE_CACHE_SIZE = int(os.environ.get('EMPLOYEE_CACHE_SIZE', 10000))
+    EMPLOYEE_CACHE_TTL = float(os.environ.get('EMPLOYEE_CACHE_TTL', 60))
+    EMPLOYEE_CACHE_NEGATIVE_TTL = float(os.environ.get('EMPLOYEE_CACHE_NEGATIVE_TTL', 10))
+
+    # Снимки истории действий сотрудников
+    ACTIONS_CACHE_SIZE = int(os.environ.get('ACTIONS_CACHE_SIZE', 1024))
+    ACTIONS_CACHE_TTL = float(os.environ.get('ACTIONS_CACHE_TTL', 30))
+    ACTIONS_PAGE_SIZE = int(os.environ.get('ACTIONS_PAGE_SIZE', 20))
+    DAYS_OFF_PAGE_SIZE = int(os.environ.get('DAYS_OFF_PAGE_SIZE', 10))
+
+    # HTTP транспорт к backend API
+    API_TIMEOUT = float(os.environ.get('API_TIMEOUT', 10))
+    API_CONNECT_TIMEOUT = float(os.environ.get('API_CONNECT_TIMEOUT', 3))
+    API_DOCUMENT_TIMEOUT = float(os.environ.get('API_DOCUMENT_TIMEOUT', 60))
+    API_POOL_SIZE = int(os.environ.get('API_POOL_SIZE', 100))
+    API_POOL_SIZE_PER_HOST = int(os.environ.get('API_POOL_SIZE_PER_HOST', 50))
+    API_KEEPALIVE_TIMEOUT = float(os.environ.get('API_KEEPALIVE_TIMEOUT', 30))
+    API_DNS_CACHE_TTL = int(os.environ.get('API_DNS_CACHE_TTL', 300))
+    API_RETRIES = int(os.environ.get('API_RETRIES', 2))
+    API_RETRY_BACKOFF = float(os.environ.get('API_RETRY_BACKOFF', 0.2))
+    API_RETRY_BACKOFF_MAX = float(os.environ.get('API_RETRY_BACKOFF_MAX', 2))
+    API_BREAKER_THRESHOLD = int(os.environ.get('API_BREAKER_THRESHOLD', 5))
+    API_BREAKER_RESET_TIMEOUT = float(os.environ.get('API_BREAKER_RESET_TIMEOUT', 30))
+
+    # Кэш GET ответов backend с условными запросами (ETag/Last-Modified),
+    # предел суммарного размера тел, байт (0 - отключен)
+    API_HTTP_CACHE_SIZE = int(os.environ.get('API_HTTP_CACHE_SIZE', 0))
+
+    # Локальная база состояния бота (SQLite): кэш file_id справок.
+    # У других хранилищ свои файлы, чтобы не делить блокировку записи
+    DB_PATH = os.environ.get('DB_PATH', 'bot_state.sqlite3')
+
+    # Кэш file_id отправленных справок
+    DOCUMENT_CACHE_SIZE = int(os.environ.get('DOCUMENT_CACHE_SIZE', 10000))
+    DOCUMENT_CACHE_MAX_AGE = float(os.environ.get('DOCUMENT_CACHE_MAX_AGE', 30 * 24 * 3600))
+
+    # Загрузка справок
+    DOCUMENT_MAX_SIZE = int(os.environ.get('DOCUMENT_MAX_SIZE', 10 * 1024 * 1024))
+    DOCUMENT_CONCURRENCY = int(os.environ.get('DOCUMENT_CONCURRENCY', 8))
+    DOCUMENT_CHUNK_SIZE = int(os.environ.get('DOCUMENT_CHUNK_SIZE', 64 * 1024))
+
+    # Статистика по подразделению: одновременные запросы истории сотрудников
+    STATS_FETCH_CONCURRENCY = int(os.environ.get('STATS_FETCH_CONCURRENCY', 10))
+
+    # Хранилище FSM: memory, sqlite или redis
+    FSM_STORAGE = os.environ.get('FSM_STORAGE', 'memory')
+    FSM_STORAGE_PATH = os.environ.get('FSM_STORAGE_PATH', 'bot_fsm.sqlite3')
+    FSM_REDIS_URL = os.environ.get('FSM_REDIS_URL', 'redis://localhost:6379/0')
+    FSM_STATE_TTL = float(os.environ.get('FSM_STATE_TTL', 24 * 3600))
+    FSM_FLUSH_INTERVAL = float(os.environ.get('FSM_FLUSH_INTERVAL', 0.5))
+    FSM_FLUSH_BATCH_SIZE = int(os.environ.get('FSM_FLUSH_BATCH_SIZE', 200))
+    FSM_COMPACTION_INTERVAL = float(os.environ.get('FSM_COMPACTION_INTERVAL', 3600))
+
+    # Режим получения обновлений: polling или webhook
+    BOT_MODE = os.environ.get('BOT_MODE', 'polling')
+    WEBHOOK_BASE_URL = os.environ.get('WEBHOOK_BASE_URL')
+    WEBHOOK_PATH = os.environ.get('WEBHOOK_PATH', '/webhook')
+    WEBHOOK_SECRET = os.environ.get('WEBHOOK_SECRET')
+    WEBHOOK_HOST = os.environ.get('WEBHOOK_HOST', '0.0.0.0')
+    WEBHOOK_PORT = int(os.environ.get('WEBHOOK_PORT', 8080))
+    WEBHOOK_QUEUE_SIZE = int(os.environ.get('WEBHOOK_QUEUE_SIZE', 1000))
+    WEBHOOK_WORKERS = int(os.environ.get('WEBHOOK_WORKERS', 16))
+
+    # Отчет о задержке обработки обновлений (каждые N обновлений)
+    LATENCY_REPORT_EVERY = int(os.environ.get('LATENCY_REPORT_EVERY', 1000))
+
+    # Обработка в нескольких процессах (0 или 1 - в одном процессе)
+    BOT_WORKERS = int(os.environ.get('BOT_WORKERS', 0))
+    SHARD_QUEUE_SIZE = int(os.environ.get('SHARD_QUEUE_SIZE', 1000))
+    SHARD_LANES = int(os.environ.get('SHARD_LANES', 16))
+    SHARD_DRAIN_TIMEOUT = float(os.environ.get('SHARD_DRAIN_TIMEOUT', 30))
+
+    # Ограничение частоты запросов: токенов в секунду и размер ведра
+    THROTTLE_DEFAULT_RATE = float(os.environ.get('THROTTLE_DEFAULT_RATE', 1))
+    THROTTLE_DEFAULT_BURST = float(os.environ.get('THROTTLE_DEFAULT_BURST', 5))
+    THROTTLE_REPORT_RATE = float(os.environ.get('THROTTLE_REPORT_RATE', 0.1))
+    THROTTLE_REPORT_BURST = float(os.environ.get('THROTTLE_REPORT_BURST', 2))
+    THROTTLE_DOCUMENT_RATE = float(os.environ.get('THROTTLE_DOCUMENT_RATE', 1 / 30))
+    THROTTLE_DOCUMENT_BURST = float(os.environ.get('THROTTLE_DOCUMENT_BURST', 3))
+    # Сколько секунд после обработки нажатия его повтор отбрасывается
+    THROTTLE_DUPLICATE_WINDOW = float(os.environ.get('THROTTLE_DUPLICATE_WINDOW', 2))
+
+    # Метрики Prometheus (порт 0 - отключены); процессы-обработчики
+    # используют порты METRICS_PORT + 1 + номер процесса
+    METRICS_HOST = os.environ.get('METRICS_HOST', '0.0.0.0')
+    METRICS_PORT = int(os.environ.get('METRICS_PORT', 0))
+
+    # Пакетное оформление переработок; повторяются только запросы, не дошедшие до backend
+    BULK_OVERTIME_CONCURRENCY = int(os.environ.get('BULK_OVERTIME_CONCURRENCY', 5))
+    BULK_OVERTIME_RETRIES = int(os.environ.get('BULK_OVERTIME_RETRIES', 2))
+
+    # Справочник сотрудников: период полной перезагрузки и ожидание первой загрузки, с
+    DIRECTORY_REFRESH_INTERVAL = float(os.environ.get('DIRECTORY_REFRESH_INTERVAL', 300))
+    DIRECTORY_READY_TIMEOUT = float(os.environ.get('DIRECTORY_READY_TIMEOUT', 5))
+
+    # Ежемесячная рассылка итогов за прошлый месяц: день месяца (0 - отключена),
+    # час начала и сколько дней после него рассылку еще можно начать
+    DIGEST_DAY = int(os.environ.get('DIGEST_DAY', 0))
+    DIGEST_HOUR = int(os.environ.get('DIGEST_HOUR', 10))
+    DIGEST_START_WINDOW = float(os.environ.get('DIGEST_START_WINDOW', 1))
+    DIGEST_DB_PATH = os.environ.get('DIGEST_DB_PATH', 'bot_digest.sqlite3')
+    DIGEST_CHECK_INTERVAL = float(os.environ.get('DIGEST_CHECK_INTERVAL', 300))
+    DIGEST_BATCH_SIZE = int(os.environ.get('DIGEST_BATCH_SIZE', 50))
+
+    # Очередь рассылки: лимиты Telegram - сообщений в секунду на бота
+    # и минимальный интервал между сообщениями в один чат, с
+    BROADCAST_RATE = float(os.environ.get('BROADCAST_RATE', 25))
+    BROADCAST_CHAT_INTERVAL = float(os.environ.get('BROADCAST_CHAT_INTERVAL', 1))
+    BROADCAST_WORKERS = int(os.environ.get('BROADCAST_WORKERS', 8))
+    BROADCAST_RETRIES = int(os.environ.get('BROADCAST_RETRIES', 3))
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+
+from aiogram import Bot, Dispatcher
+
+from bot.config import Config
+from bot.api_client import APIClient
+from bot.metrics import register_cache
+from bot.middlewares.auth_middleware import AuthMiddleware
+from bot.middlewares.latency_middleware import LatencyMiddleware
+from bot.middlewares.metrics_middleware import MetricsMiddleware
+from bot.middlewares.throttling_middleware import ThrottlingMiddleware
+from bot.services.actions import ActionsStore
+from bot.services.broadcast import Broadcaster
+from bot.services.digest import DigestProgress, DigestScheduler
+from bot.services.directory import EmployeeDirectory
+from bot.services.documents import DocumentCache
+from bot.services.http_cache import HTTPCache
+from bot.storage import create_storage
+
+from bot.handlers import admin, common, auth, employee_handler, errors, stats
+
+logger = logging.getLogger(__name__)
+
+
+def include_routers(dp: Dispatcher):
+    """Регистрация роутеров"""
+    dp.include_router(auth.router)
+    dp.include_router(employee_handler.router)
+    dp.include_router(stats.router)
+    dp.include_router(admin.router)
+    dp.include_router(common.router)
+    dp.include_router(errors.router)
+
+
+async def create_dispatcher(digest: bool = True) -> Dispatcher:
+    """Создание диспетчера со всеми роутерами, middleware и зависимостями
+
+    digest=False отключает ежемесячную рассылку (например, во всех
+    процессах-обработчиках, кроме одного).
+    """
+    dp = Dispatcher(storage=create_storage())
+
+    api_client = APIClient(
+        Config.API_URL,
+        http_cache=HTTPCache(Config.API_HTTP_CACHE_SIZE) if Config.API_HTTP_CACHE_SIZE else None,
+    )
+    await api_client.create_session()
+
+    actions_store = ActionsStore(
+        api_client,
+        maxsize=Config.ACTIONS_CACHE_SIZE,
+        ttl=Config.ACTIONS_CACHE_TTL,
+        page_size=Config.ACTIONS_PAGE_SIZE,
+    )
+
+    document_cache = DocumentCache(
+        Config.DB_PATH,
+        max_entries=Config.DOCUMENT_CACHE_SIZE,
+        max_age=Config.DOCUMENT_CACHE_MAX_AGE,
+    )
+
+    # Регистрируем middleware
+    dp.update.outer_middleware(LatencyMiddleware(Config.BOT_MODE, report_every=Config.LATENCY_REPORT_EVERY))
+    # Ограничение частоты стоит перед авторизацией, чтобы лишние запросы не доходили до backend
+    throttling_middleware = ThrottlingMiddleware({
+        "default": (Config.THROTTLE_DEFAULT_RATE, Config.THROTTLE_DEFAULT_BURST),
+        "report": (Config.THROTTLE_REPORT_RATE, Config.THROTTLE_REPORT_BURST),
+        "document": (Config.THROTTLE_DOCUMENT_RATE, Config.THROTTLE_DOCUMENT_BURST),
+    }, duplicate_window=Config.THROTTLE_DUPLICATE_WINDOW)
+    dp.message.middleware(throttling_middleware)
+    dp.callback_query.middleware(throttling_middleware)
+
+    auth_middleware = AuthMiddleware(api_client)
+    dp.message.middleware(auth_middleware)
+    dp.callback_query.middleware(auth_middleware)
+    dp.inline_query.middleware(auth_middleware)
+
+    metrics_middleware = MetricsMiddleware()
+    dp.message.middleware(metrics_middleware)
+    dp.callback_query.middleware(metrics_middleware)
+    dp.inline_query.middleware(metrics_middleware)
+    register_cache("employees", auth_middleware.employee_cache)
+    register_cache("actions", actions_store.cache)
+    if api_client.http_cache is not None:
+        register_cache("http", api_client.http_cache)
+
+    include_routers(dp)
+
+    employee_directory = EmployeeDirectory(
+        api_client,
+        refresh_interval=Config.DIRECTORY_REFRESH_INTERVAL,
+        ready_timeout=Config.DIRECTORY_READY_TIMEOUT,
+    )
+    digest_scheduler = None
+    if digest and Config.DIGEST_DAY:
+        digest_scheduler = DigestScheduler(
+            Broadcaster(
+                rate=Config.BROADCAST_RATE,
+                chat_interval=Config.BROADCAST_CHAT_INTERVAL,
+                workers=Config.BROADCAST_WORKERS,
+                retries=Config.BROADCAST_RETRIES,
+            ),
+            employee_directory,
+            actions_store,
+            DigestProgress(Config.DIGEST_DB_PATH),
+            day=Config.DIGEST_DAY,
+            hour=Config.DIGEST_HOUR,
+            start_window=Config.DIGEST_START_WINDOW,
+            check_interval=Config.DIGEST_CHECK_INTERVAL,
+            batch_size=Config.DIGEST_BATCH_SIZE,
+            fetch_concurrency=Config.STATS_FETCH_CONCURRENCY,
+        )
+
+    # Добавляем api_client в контекст для всех хендлеров
+    dp.workflow_data.update(
+        api_client=api_client,
+        employee_cache=auth_middleware.employee_cache,
+        actions_store=actions_store,
+        document_cache=document_cache,
+        document_slots=asyncio.Semaphore(Config.DOCUMENT_CONCURRENCY),
+        employee_directory=employee_directory,
+        digest_scheduler=digest_scheduler,
+    )
+
+    dp.startup.register(on_startup)
+    dp.shutdown.register(on_shutdown)
+    return dp
+
+
+async def on_startup(bot: Bot, employee_directory: EmployeeDirectory, digest_scheduler: DigestScheduler = None):
+    """Запуск фоновых задач"""
+    employee_directory.start()
+    if digest_scheduler is not None:
+        digest_scheduler.start(bot)
+
+
+async def on_shutdown(api_client: APIClient, document_cache: DocumentCache, employee_cache,
+                      employee_directory: EmployeeDirectory, digest_scheduler: DigestScheduler = None):
+    """Освобождение ресурсов при остановке (хранилище FSM закрывает сам aiogram)"""
+    logger.info(f"Employee cache stats: {employee_cache.stats()}")
+    if digest_scheduler is not None:
+        await digest_scheduler.stop()
+    await employee_directory.stop()
+    await api_client.close_session()
+    document_cache.close()
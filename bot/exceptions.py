@@ -0,0 +1,18 @@
+class APIError(Exception):
+    """Базовая ошибка обращения к backend API"""
+
+
+class APIUnavailableError(APIError):
+    """Backend недоступен: сетевая ошибка, таймаут или ответ 5xx"""
+
+    def __init__(self, message: str, status: int = None):
+        super().__init__(message)
+        self.status = status
+
+
+class CircuitOpenError(APIUnavailableError):
+    """Запрос не отправлен: backend помечен недоступным автоматом размыкания"""
+
+
+class DocumentTooLargeError(APIError):
+    """Файл от backend превышает допустимый размер"""
@@ -0,0 +1,237 @@
+import html
+import time
+from typing import List
+
+from aiogram import Bot, Router, F
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.filters import Command, CommandObject, CommandStart
+from aiogram.fsm.context import FSMContext
+from aiogram.types import (
+    CallbackQuery, InlineQuery, InlineQueryResultArticle, InputTextMessageContent, Message
+)
+
+from bot.config import Config
+from bot.keyboards.callbacks import EmployeeCallback
+from bot.keyboards.employee_kb import get_employee_menu, get_cancel_menu, get_employees_inline
+from bot.models import Employee
+from bot.services.bulk_overtime import EmployeeResolver, OvertimeRow, parse_table, submit_rows
+from bot.states.forms import OvertimeForm
+
+router = Router()
+
+BATCH_HELP = (
+    "➕ <b>Оформление переработок</b>\n\n"
+    "Отправьте таблицу текстом или CSV файлом, по строке на запись:\n"
+    "<code>сотрудник; дата; часы</code>\n\n"
+    "Сотрудник - логин, ID или ФИО. Дата - ГГГГ-ММ-ДД или ДД.ММ.ГГГГ.\n"
+    "Разделитель - «;», «,» или табуляция, строка заголовка допускается.\n\n"
+    "Пример:\n"
+    "<code>ivanov; 2026-10-17; 4\n"
+    "Петров Петр Петрович; 17.10.2026; 6</code>"
+)
+DIRECTORY_UNAVAILABLE = "❌ Справочник сотрудников сейчас недоступен, попробуйте позже."
+MAX_CSV_SIZE = 1024 * 1024
+MAX_MESSAGE_LENGTH = 4000
+SEARCH_LIMIT = 10
+INLINE_SEARCH_LIMIT = 50
+FIND_USAGE = (
+    "ℹ️ Использование:\n"
+    "/find <i>фамилия, имя или логин</i>\n"
+    "/find отдел <i>название отдела</i>\n"
+    "/find должность <i>название должности</i>"
+)
+
+
+def employee_card(employee: Employee) -> str:
+    """Карточка сотрудника для администратора"""
+    return (
+        f"👤 <b>{html.escape(employee.full_name)}</b>\n"
+        f"Логин: {html.escape(employee.login)}\n"
+        f"📋 Должность: {html.escape(employee.post_name or 'Не указана')}\n"
+        f"🏢 Отдел: {html.escape(employee.otdel_name or 'Не указан')}\n"
+        f"👔 Роль: {employee.role_name}\n"
+        f"💤 Неиспользованных часов: {employee.idle_hours}\n"
+        f"Telegram: {'привязан' if employee.tg_id else 'не привязан'}"
+    )
+
+
+def batch_report(rows: List[OvertimeRow]) -> str:
+    """Итог пакетного оформления; тексты ошибок содержат ввод пользователя и экранируются"""
+    failed = [row for row in rows if row.error is not None]
+    report = f"✅ Оформлено: {len(rows) - len(failed)}\n❌ Ошибок: {len(failed)}"
+    if failed:
+        report += "\n\n<b>Ошибки:</b>"
+        for row in failed:
+            line = f"\nСтрока {row.line}: {html.escape(row.error)}"
+            if len(report) + len(line) > MAX_MESSAGE_LENGTH:
+                report += "\n…"
+                break
+            report += line
+    return report
+
+
+@router.message(Command("find"))
+async def cmd_find(message: Message, command: CommandObject, is_admin: bool = False, employee_directory=None):
+    """Поиск сотрудников: /find <запрос>"""
+    if not is_admin:
+        await message.answer("❌ Эта функция доступна только администраторам.")
+        return
+    if not command.args:
+        await message.answer(FIND_USAGE, parse_mode="HTML")
+        return
+
+    if not await employee_directory.ready():
+        await message.answer(DIRECTORY_UNAVAILABLE)
+        return
+    kind, _, rest = command.args.partition(" ")
+    if kind.lower() == "отдел" and rest:
+        employees = employee_directory.by_otdel(rest)
+    elif kind.lower() == "должность" and rest:
+        employees = employee_directory.by_post(rest)
+    else:
+        employees = employee_directory.search(command.args, limit=SEARCH_LIMIT + 1)
+
+    if not employees:
+        await message.answer("🔍 Никого не найдено.")
+        return
+
+    if len(employees) > SEARCH_LIMIT:
+        text = f"🔍 Показаны первые {SEARCH_LIMIT}, уточните запрос"
+    else:
+        text = f"🔍 Найдено: {len(employees)}"
+    await message.answer(text, reply_markup=get_employees_inline(employees[:SEARCH_LIMIT]))
+
+
+@router.callback_query(EmployeeCallback.filter())
+async def show_employee(callback: CallbackQuery, callback_data: EmployeeCallback, is_admin: bool = False,
+                        employee_directory=None):
+    """Карточка выбранного сотрудника"""
+    if not is_admin:
+        await callback.answer("❌ Эта функция доступна только администраторам.", show_alert=True)
+        return
+
+    employee = employee_directory.get(callback_data.employee_id)
+    if employee is None:
+        await callback.answer("Сотрудник не найден.", show_alert=True)
+        return
+    await callback.message.answer(employee_card(employee), parse_mode="HTML")
+    await callback.answer()
+
+
+@router.inline_query()
+async def inline_search(inline_query: InlineQuery, is_admin: bool = False, employee_directory=None):
+    """Инлайн поиск сотрудников для администраторов"""
+    if not is_admin or not inline_query.query.strip():
+        await inline_query.answer([], cache_time=5, is_personal=True)
+        return
+
+    if not await employee_directory.ready():
+        await inline_query.answer([], cache_time=5, is_personal=True)
+        return
+    results = [
+        InlineQueryResultArticle(
+            id=str(employee.employee_id),
+            title=employee.full_name,
+            description=" · ".join(filter(None, (employee.login, employee.post_name, employee.otdel_name))),
+            input_message_content=InputTextMessageContent(message_text=employee_card(employee), parse_mode="HTML"),
+        )
+        for employee in employee_directory.search(inline_query.query, limit=INLINE_SEARCH_LIMIT)
+    ]
+    await inline_query.answer(results, cache_time=30, is_personal=True)
+
+
+@router.message(F.text == "➕ Оформить переработку")
+async def start_batch(message: Message, state: FSMContext, is_admin: bool = False):
+    """Начало пакетного оформления переработок"""
+    if not is_admin:
+        await message.answer("❌ Эта функция доступна только администраторам.")
+        return
+
+    await state.set_state(OvertimeForm.batch)
+    await message.answer(BATCH_HELP, reply_markup=get_cancel_menu(), parse_mode="HTML")
+
+
+@router.message(OvertimeForm.batch, F.text == "❌ Отмена")
+@router.message(OvertimeForm.batch, CommandStart())
+async def cancel_batch(message: Message, state: FSMContext, is_admin: bool = False):
+    """Отмена оформления"""
+    await state.clear()
+    await message.answer("📋 Главное меню:", reply_markup=get_employee_menu(is_admin))
+
+
+@router.message(OvertimeForm.batch, F.document)
+async def process_batch_file(message: Message, state: FSMContext, bot: Bot, is_admin: bool = False,
+                             api_client=None, actions_store=None, employee_directory=None):
+    """Пакет переработок из CSV файла"""
+    if message.document.file_size and message.document.file_size > MAX_CSV_SIZE:
+        await message.answer("❌ Файл слишком большой (максимум 1 МБ).")
+        return
+
+    content = await bot.download(message.document)
+    try:
+        text = content.read().decode("utf-8-sig")
+    except UnicodeDecodeError:
+        await message.answer("❌ Не удалось прочитать файл. Сохраните CSV в кодировке UTF-8.")
+        return
+
+    await process_batch(message, state, text, is_admin, api_client, actions_store, employee_directory)
+
+
+# Команды не разбираются как строки таблицы: /help и другие обрабатывают свои роутеры
+@router.message(OvertimeForm.batch, F.text, ~F.text.startswith("/"))
+async def process_batch_text(message: Message, state: FSMContext, is_admin: bool = False,
+                             api_client=None, actions_store=None, employee_directory=None):
+    """Пакет переработок из текста сообщения"""
+    await process_batch(message, state, message.text, is_admin, api_client, actions_store, employee_directory)
+
+
+async def process_batch(message: Message, state: FSMContext, text: str, is_admin: bool,
+                        api_client, actions_store, employee_directory):
+    """Проверка строк, отправка и итоговый отчет"""
+    if not is_admin:
+        await state.clear()
+        await message.answer("❌ Эта функция доступна только администраторам.")
+        return
+
+    if not await employee_directory.ready():
+        # Состояние не сбрасываем: таблицу можно отправить повторно
+        await message.answer(DIRECTORY_UNAVAILABLE)
+        return
+    rows = parse_table(text, EmployeeResolver(employee_directory.all()))
+    if not rows:
+        await message.answer("❌ Не найдено ни одной строки. Отправьте таблицу или нажмите «❌ Отмена».")
+        return
+
+    valid = sum(1 for row in rows if row.error is None)
+    progress = await message.answer(f"⏳ Отправка: 0/{valid}...")
+    last_edit = time.monotonic()
+
+    async def on_progress(done: int, total: int):
+        nonlocal last_edit
+        # Редактируем не чаще раза в секунду, чтобы не упереться в лимиты Telegram
+        if done < total and time.monotonic() - last_edit < 1:
+            return
+        last_edit = time.monotonic()
+        try:
+            await progress.edit_text(f"⏳ Отправка: {done}/{total}...")
+        except TelegramBadRequest:
+            pass
+
+    await submit_rows(
+        api_client,
+        rows,
+        concurrency=Config.BULK_OVERTIME_CONCURRENCY,
+        retries=Config.BULK_OVERTIME_RETRIES,
+        on_progress=on_progress,
+    )
+
+    for employee_id in {row.employee.employee_id for row in rows if row.error is None}:
+        actions_store.invalidate(employee_id)
+
+    report = batch_report(rows)
+    await state.clear()
+    try:
+        await progress.edit_text(report, parse_mode="HTML")
+    except TelegramBadRequest:
+        await message.answer(report, parse_mode="HTML")
+    await message.answer("📋 Главное меню:", reply_markup=get_employee_menu(is_admin))
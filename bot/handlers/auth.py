@@ -4,6 +4,7 @@ from aiogram.types import Message, ReplyKeyboardRemove
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import default_state
 
+from bot.models import Employee
 from bot.states.forms import AuthForm
 from bot.keyboards.employee_kb import get_employee_menu, get_profile_menu
 
@@ -12,16 +13,15 @@ router = Router()
 COMMANDS = ["/start","/hel["]
 
 @router.message(CommandStart(), StateFilter(default_state))
-async def cmd_start(message: Message, state: FSMContext, employee: dict = None, api_client=None):
+async def cmd_start(message: Message, state: FSMContext, employee: Employee = None, is_admin: bool = False,
+                    api_client=None):
     """Команда /start"""
     if employee:
         # Пользователь уже авторизован
-        role_name = "Администратор" if employee["role_id"] == 1 else "Сотрудник"
-
         await message.answer(
-            f"👋 С возвращением, {employee['name']} {employee['patronymic']}!\n"
-            f"Роль: {role_name}",
-            reply_markup=get_employee_menu()
+            f"👋 С возвращением, {employee.name} {employee.patronymic}!\n"
+            f"Роль: {employee.role_name}",
+            reply_markup=get_employee_menu(is_admin)
         )
     else:
         # Запрашиваем авторизацию
@@ -34,7 +34,7 @@ async def cmd_start(message: Message, state: FSMContext, employee: dict = None,
         await state.set_state(AuthForm.login)
 
 
-@router.message(AuthForm.login)
+@router.message(AuthForm.login, flags={"employee": False})
 async def process_login(message: Message, state: FSMContext):
     """Обработка ввода логина"""
     if message.text.strip() in COMMANDS:
@@ -45,8 +45,8 @@ async def process_login(message: Message, state: FSMContext):
     await state.set_state(AuthForm.password)
 
 
-@router.message(AuthForm.password)
-async def process_password(message: Message, state: FSMContext, api_client):
+@router.message(AuthForm.password, flags={"employee": False})
+async def process_password(message: Message, state: FSMContext, api_client, employee_cache=None):
     """Обработка ввода пароля и авторизация"""
     if message.text.strip() in COMMANDS:
         await message.delete()
@@ -70,23 +70,24 @@ async def process_password(message: Message, state: FSMContext, api_client):
         return
 
     # Привязываем Telegram ID
-    success = await api_client.link_telegram(employee["employee_id"], message.from_user.id)
+    success = await api_client.link_telegram(employee.employee_id, message.from_user.id)
 
     if not success:
         await message.answer("❌ Ошибка при привязке аккаунта. Попробуйте позже.")
         await state.clear()
         return
 
-    # Успешная авторизация
-    role_name = "Администратор" if employee["role_id"] == 1 else "Сотрудник"
-
+    # Сбрасываем закэшированный отрицательный результат поиска по tg_id
+    if employee_cache is not None:
+        employee_cache.invalidate(message.from_user.id)
 
+    # Успешная авторизация
     await message.answer(
         f"✅ Авторизация успешна!\n\n"
-        f"👤 {employee['surname']} {employee['name']} {employee['patronymic']}\n"
-        f"📋 Должность: {employee.get('post', {}).get('name_post', 'Не указана')}\n"
-        f"🏢 Отдел: {employee.get('otdel', {}).get('name_otdel', 'Не указан')}\n"
-        f"👔 Роль: {role_name}",
+        f"👤 {employee.full_name}\n"
+        f"📋 Должность: {employee.post_name or 'Не указана'}\n"
+        f"🏢 Отдел: {employee.otdel_name or 'Не указан'}\n"
+        f"👔 Роль: {employee.role_name}",
         reply_markup=get_profile_menu()
     )
 
@@ -94,34 +95,35 @@ async def process_password(message: Message, state: FSMContext, api_client):
 
 
 @router.message(F.text == "👤 Профиль")
-async def show_profile(message: Message, employee: dict = None):
+async def show_profile(message: Message, employee: Employee = None):
     """Показать профиль"""
     if not employee:
         await message.answer("❌ Вы не авторизованы. Используйте /start")
         return
 
-    role_name = "Администратор" if employee["role_id"] == 1 else "Сотрудник"
-
     profile_text = (
         f"👤 <b>Ваш профиль</b>\n\n"
-        f"ФИО: {employee['surname']} {employee['name']} {employee['patronymic']}\n"
-        f"Логин: {employee['login']}\n"
-        f"Роль: {role_name}\n"
-        f"Telegram ID: {employee['tg_id']}"
+        f"ФИО: {employee.full_name}\n"
+        f"Логин: {employee.login}\n"
+        f"Роль: {employee.role_name}\n"
+        f"Telegram ID: {employee.tg_id}"
     )
 
     await message.answer(profile_text, reply_markup=get_profile_menu(), parse_mode="HTML")
 
 
 @router.message(F.text == "🚪 Выйти из профиля")
-async def logout(message: Message, employee: dict = None, api_client=None):
+async def logout(message: Message, employee: Employee = None, api_client=None, employee_cache=None):
     """Выход из профиля"""
     if not employee:
         await message.answer("❌ Вы не авторизованы.")
         return
 
     # Отвязываем Telegram ID
-    success = await api_client.unlink_telegram(employee["employee_id"])
+    success = await api_client.unlink_telegram(employee.employee_id)
+
+    if employee_cache is not None:
+        employee_cache.invalidate(message.from_user.id)
 
     if success:
         await message.answer(
@@ -134,10 +136,10 @@ async def logout(message: Message, employee: dict = None, api_client=None):
 
 
 @router.message(F.text == "◀️ Назад")
-async def back_to_menu(message: Message, employee: dict = None):
+async def back_to_menu(message: Message, employee: Employee = None, is_admin: bool = False):
     """Возврат в главное меню"""
     if not employee:
         await message.answer("❌ Вы не авторизованы. Используйте /start")
         return
 
-    await message.answer("📋 Главное меню:", reply_markup=get_employee_menu())
+    await message.answer("📋 Главное меню:", reply_markup=get_employee_menu(is_admin))
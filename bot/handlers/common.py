@@ -2,11 +2,13 @@ from aiogram import Router
 from aiogram.filters import Command
 from aiogram.types import Message
 
+from bot.models import Employee
+
 router = Router()
 
 
 @router.message(Command("help"))
-async def cmd_help(message: Message, employee: dict = None, is_admin: bool = False):
+async def cmd_help(message: Message, employee: Employee = None, is_admin: bool = False):
     """Команда помощи"""
     if not employee:
         await message.answer(
@@ -21,9 +23,12 @@ async def cmd_help(message: Message, employee: dict = None, is_admin: bool = Fal
     help_text += "⏰ Мои часы - информация о часах\n"
     help_text += "📅 Мои выходные - список выходных дней\n"
     help_text += "👤 Профиль - информация о профиле\n"
+    help_text += "/stats [с] [по] - статистика часов за период\n"
 
     if is_admin:
         help_text += "\n<b>Администраторские функции:</b>\n"
         help_text += "➕ Оформить переработку\n"
+        help_text += "/stats all [с] [по] - статистика по всем сотрудникам\n"
+        help_text += "/find запрос - поиск сотрудников (также через @бот запрос)\n"
 
     await message.answer(help_text, parse_mode="HTML")
@@ -1,71 +1,105 @@
-import os
+import logging
+from contextlib import nullcontext
 
 from aiogram import Router, F
-from aiogram.types import Message, CallbackQuery, FSInputFile
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import Message, CallbackQuery, BufferedInputFile
 from datetime import datetime
-from collections import defaultdict
-import tempfile
-from bot.keyboards.employee_kb import get_days_off_inline
+
+from bot.config import Config
+from bot.exceptions import DocumentTooLargeError
+from bot.metrics import DOCUMENT_FILE_ID_REUSE
+from bot.keyboards.callbacks import ActionsPageCallback, DaysOffPageCallback, DocumentCallback
+from bot.keyboards.employee_kb import get_days_off_inline, get_actions_pager
+from bot.models import Employee
+
+logger = logging.getLogger(__name__)
 
 router = Router()
 
 
+def render_actions_page(snapshot, page: int) -> str:
+    """Текст одной страницы истории действий"""
+    month, page_actions, continued = snapshot.pages[page]
+    month_name = datetime.strptime(month, "%Y-%m").strftime("%B %Y")
+
+    lines = ["📊 <b>Ваши действия:</b>\n"]
+    lines.append(f"<b>{month_name}</b>" + (" (продолжение)" if continued else ""))
+    for action in page_actions:
+        lines.append(
+            f"  📅 {action.date_action}\n"
+            f"  📝 {action.action_type_name}\n"
+            f"  ⏰ {action.hours} ч.\n"
+        )
+    return "\n".join(lines)
+
+
 @router.message(F.text == "📊 Мои действия")
-async def show_my_actions(message: Message, employee: dict = None, api_client=None):
-    """Показать все действия сотрудника"""
+async def show_my_actions(message: Message, employee: Employee = None, actions_store=None):
+    """Показать действия сотрудника постранично"""
     if not employee:
         await message.answer("❌ Вы не авторизованы. Используйте /start")
         return
 
-    actions = await api_client.get_employee_actions(employee["employee_id"])
+    snapshot = await actions_store.get(employee.employee_id)
 
-    if not actions:
+    if not snapshot:
         await message.answer("📊 У вас пока нет записей о действиях.")
         return
 
-    # Группируем по месяцам
-    actions_by_month = defaultdict(list)
-    for action in actions:
-        date = datetime.strptime(action["date_action"], "%Y-%m-%d")
-        month_key = date.strftime("%Y-%m")
-        actions_by_month[month_key].append(action)
+    await message.answer(
+        render_actions_page(snapshot, 0),
+        reply_markup=get_actions_pager(0, len(snapshot.pages)),
+        parse_mode="HTML"
+    )
 
-    response = "📊 <b>Ваши действия:</b>\n\n"
 
-    for month, month_actions in sorted(actions_by_month.items(), reverse=True):
-        month_name = datetime.strptime(month, "%Y-%m").strftime("%B %Y")
-        response += f"<b>{month_name}</b>\n"
+@router.callback_query(ActionsPageCallback.filter())
+async def show_actions_page(
+        callback: CallbackQuery,
+        callback_data: ActionsPageCallback,
+        employee: Employee = None,
+        actions_store=None
+):
+    """Листание истории действий: редактирует уже отправленное сообщение"""
+    if not employee:
+        await callback.answer("❌ Вы не авторизованы. Используйте /start", show_alert=True)
+        return
 
-        for action in sorted(month_actions, key=lambda x: x["date_action"], reverse=True):
-            response += (
-                f"  📅 {action['date_action']}\n"
-                f"  📝 {action['action_type_name']}\n"
-                f"  ⏰ {action['hours']} ч.\n\n"
-            )
+    snapshot = await actions_store.get(employee.employee_id)
 
-    await message.answer(response, parse_mode="HTML")
+    if not snapshot:
+        await callback.answer("📊 У вас пока нет записей о действиях.")
+        return
+
+    # История могла измениться с момента отправки сообщения
+    page = min(max(callback_data.page, 0), len(snapshot.pages) - 1)
+    try:
+        await callback.message.edit_text(
+            render_actions_page(snapshot, page),
+            reply_markup=get_actions_pager(page, len(snapshot.pages)),
+            parse_mode="HTML"
+        )
+    except TelegramBadRequest as e:
+        # Нажата кнопка текущей страницы - сообщение не изменилось
+        if "message is not modified" not in str(e):
+            raise
+    await callback.answer()
 
 
 @router.message(F.text == "⏰ Мои часы")
-async def show_my_hours(message: Message, employee: dict = None, api_client=None):
+async def show_my_hours(message: Message, employee: Employee = None, actions_store=None):
     """Показать информацию о часах"""
     if not employee:
         await message.answer("❌ Вы не авторизованы. Используйте /start")
         return
 
-    actions = await api_client.get_employee_actions(employee["employee_id"])
+    snapshot = await actions_store.get(employee.employee_id)
 
     # Подсчет переработанных часов за текущий месяц
-    current_month = datetime.now().strftime("%Y-%m")
-    month_hours = 0
-
-    if actions:
-        for action in actions:
-            action_date = datetime.strptime(action["date_action"], "%Y-%m-%d")
-            if action_date.strftime("%Y-%m") == current_month:
-                month_hours += action["hours"]
+    month_hours = snapshot.month_hours() if snapshot else 0
 
-    idle_hours = employee.get("idle_hours", 0)
+    idle_hours = employee.idle_hours
 
     response = (
         f"⏰ <b>Информация о часах</b>\n\n"
@@ -77,21 +111,30 @@ async def show_my_hours(message: Message, employee: dict = None, api_client=None
     await message.answer(response, parse_mode="HTML")
 
 
+def days_off_keyboard(snapshot, page: int):
+    """Клавиатура страницы выходных, кэшируется в снимке"""
+    key = ("days_off", page)
+    keyboard = snapshot.views.get(key)
+    if keyboard is None:
+        keyboard = get_days_off_inline(snapshot.days_off, page, Config.DAYS_OFF_PAGE_SIZE)
+        snapshot.views[key] = keyboard
+    return keyboard
+
+
 @router.message(F.text == "📅 Мои выходные")
-async def show_days_off(message: Message, employee: dict = None, api_client=None):
+async def show_days_off(message: Message, employee: Employee = None, actions_store=None):
     """Показать выходные дни (где actiontype = выходной)"""
     if not employee:
         await message.answer("❌ Вы не авторизованы. Используйте /start")
         return
 
-    actions = await api_client.get_employee_actions(employee["employee_id"])
+    snapshot = await actions_store.get(employee.employee_id)
 
-    if not actions:
+    if not snapshot:
         await message.answer("📅 У вас пока нет выходных дней.")
         return
 
-    # Фильтруем только выходные (предполагаем что actiontype_id = 2 это выходной)
-    days_off = [a for a in actions if "выходной" in a["action_type_name"].lower() or a["actiontype_id"] == 1]
+    days_off = snapshot.days_off
 
     if not days_off:
         await message.answer("📅 У вас пока нет оформленных выходных дней.")
@@ -100,28 +143,84 @@ async def show_days_off(message: Message, employee: dict = None, api_client=None
     response = "📅 <b>Ваши выходные дни:</b>\n\n"
     response += "Нажмите на дату, чтобы запросить справку о выходном дне:\n\n"
 
-    keyboard = get_days_off_inline(days_off)
+    keyboard = days_off_keyboard(snapshot, 0)
 
     await message.answer(response, reply_markup=keyboard, parse_mode="HTML")
 
 
-@router.callback_query(F.data.startswith("document_"))
-async def request_document(callback: CallbackQuery, api_client):
-    action_id = int(callback.data.split("_")[1])
-    await callback.answer("📄 Формирование справки...")
-
-    file_bytes = await api_client.get_holiday_document_by_action(action_id)
-    if not file_bytes:
-        await callback.message.answer("❌ Ошибка при получении документа.")
+@router.callback_query(DaysOffPageCallback.filter())
+async def show_days_off_page(
+        callback: CallbackQuery,
+        callback_data: DaysOffPageCallback,
+        employee: Employee = None,
+        actions_store=None
+):
+    """Листание списка выходных: меняет клавиатуру уже отправленного сообщения"""
+    if not employee:
+        await callback.answer("❌ Вы не авторизованы. Используйте /start", show_alert=True)
         return
 
-    with tempfile.NamedTemporaryFile(suffix='.doc', delete=False) as tmp:
-        tmp.write(file_bytes)
-        temp_filepath = tmp.name
+    snapshot = await actions_store.get(employee.employee_id)
+
+    if not snapshot or not snapshot.days_off:
+        await callback.answer("📅 У вас пока нет оформленных выходных дней.")
+        return
 
+    pages = (len(snapshot.days_off) + Config.DAYS_OFF_PAGE_SIZE - 1) // Config.DAYS_OFF_PAGE_SIZE
+    page = min(max(callback_data.page, 0), pages - 1)
     try:
-        input_doc = FSInputFile(temp_filepath, filename=f"holiday_document_{action_id}.doc")
-        await callback.message.answer_document(document=input_doc)
-    finally:
-        if os.path.exists(temp_filepath):
-            os.unlink(temp_filepath)
\ No newline at end of file
+        await callback.message.edit_reply_markup(reply_markup=days_off_keyboard(snapshot, page))
+    except TelegramBadRequest as e:
+        if "message is not modified" not in str(e):
+            raise
+    await callback.answer()
+
+
+@router.callback_query(DocumentCallback.filter(), flags={"throttling": "document", "employee": False})
+@router.callback_query(F.data.startswith("document_"), flags={"throttling": "document", "employee": False})
+async def request_document(
+        callback: CallbackQuery,
+        api_client,
+        callback_data: DocumentCallback = None,
+        document_cache=None,
+        document_slots=None
+):
+    if callback_data is not None:
+        action_id, version = callback_data.action_id, callback_data.version
+    else:
+        # Кнопки старого формата: document_{action_id}[_{version}]
+        _, action_id, *rest = callback.data.split("_")
+        action_id = int(action_id)
+        version = rest[0] if rest else None
+    await callback.answer("📄 Формирование справки...")
+
+    # Справка уже отправлялась: пересылаем по file_id без генерации и загрузки
+    if version and document_cache is not None:
+        file_id = document_cache.get(action_id, version)
+        if file_id:
+            try:
+                await callback.message.answer_document(document=file_id)
+                DOCUMENT_FILE_ID_REUSE.inc("hit")
+                return
+            except TelegramBadRequest as e:
+                logger.warning(f"Cached file_id for action {action_id} rejected: {e}")
+                document_cache.invalidate(action_id)
+
+    # Число одновременно загружаемых справок ограничено, чтобы память не росла
+    async with document_slots or nullcontext():
+        try:
+            file_bytes = await api_client.get_holiday_document_by_action(action_id)
+        except DocumentTooLargeError as e:
+            logger.error(f"Document for action {action_id} rejected: {e}")
+            file_bytes = None
+        if not file_bytes:
+            await callback.message.answer("❌ Ошибка при получении документа.")
+            return
+
+        # Файл отправляется из памяти, без временного файла на диске
+        input_doc = BufferedInputFile(file_bytes, filename=f"holiday_document_{action_id}.doc")
+        sent = await callback.message.answer_document(document=input_doc)
+        DOCUMENT_FILE_ID_REUSE.inc("upload")
+
+    if version and document_cache is not None and sent.document:
+        document_cache.set(action_id, version, sent.document.file_id)
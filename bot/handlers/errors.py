@@ -0,0 +1,24 @@
+import logging
+
+from aiogram import Router
+from aiogram.filters import ExceptionTypeFilter
+from aiogram.types import ErrorEvent
+
+from bot.exceptions import APIUnavailableError
+
+logger = logging.getLogger(__name__)
+
+router = Router()
+
+
+@router.error(ExceptionTypeFilter(APIUnavailableError))
+async def api_unavailable(event: ErrorEvent):
+    """Backend недоступен: сообщаем пользователю вместо молчания"""
+    logger.warning(f"Backend unavailable while handling update {event.update.update_id}: {event.exception}")
+
+    text = "⚠️ Сервис временно недоступен. Попробуйте позже."
+    update = event.update
+    if update.message:
+        await update.message.answer(text)
+    elif update.callback_query and update.callback_query.message:
+        await update.callback_query.message.answer(text)
@@ -0,0 +1,133 @@
+import asyncio
+from datetime import date
+
+from aiogram import Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message
+
+from bot.config import Config
+from bot.models import Employee
+from bot.services.analytics import HoursSeries
+from bot.services.dates import parse_date
+
+router = Router()
+
+STATS_USAGE = (
+    "ℹ️ Использование: /stats [с] [по]\n"
+    "Даты в формате ГГГГ-ММ-ДД или ДД.ММ.ГГГГ.\n"
+    "Администраторы: /stats all [с] [по] - по всем сотрудникам."
+)
+# Сколько последних кварталов и месяцев показывать; длинные периоды
+# иначе не помещаются в сообщение Telegram (4096 символов)
+MAX_QUARTERS = 12
+MAX_MONTHS = 24
+MAX_MESSAGE_LENGTH = 4096
+
+
+def format_hours(hours: float) -> str:
+    return f"{hours:g}"
+
+
+def render_stats(series: HoursSeries, start: date, end: date, title: str) -> str:
+    """Текст отчета по часам за период"""
+    lines = [
+        f"📈 <b>{title}</b>",
+        f"Период: {start.isoformat()} — {end.isoformat()}\n",
+        f"Всего: <b>{format_hours(series.total(start, end))}</b> ч.",
+        f"С начала {end.year} года: <b>{format_hours(series.year_to_date(end))}</b> ч.",
+        f"За 30 дней: <b>{format_hours(series.rolling(end, 30))}</b> ч.",
+        f"За 90 дней: <b>{format_hours(series.rolling(end, 90))}</b> ч.",
+    ]
+
+    by_quarter = series.by_quarter(start, end)
+    if by_quarter:
+        lines.append(section_title("По кварталам", len(by_quarter), MAX_QUARTERS))
+        lines.extend(f"  {quarter}: {format_hours(hours)} ч."
+                     for quarter, hours in list(by_quarter.items())[-MAX_QUARTERS:])
+
+    by_month = series.by_month(start, end)
+    if by_month:
+        lines.append(section_title("По месяцам", len(by_month), MAX_MONTHS))
+        lines.extend(f"  {month}: {format_hours(hours)} ч."
+                     for month, hours in list(by_month.items())[-MAX_MONTHS:])
+
+    by_type = series.by_type(start, end)
+    if by_type:
+        lines.append("\n<b>По типам:</b>")
+        lines.extend(f"  {name}: {format_hours(hours)} ч." for name, hours in sorted(by_type.items()))
+
+    text = "\n".join(lines)
+    if len(text) > MAX_MESSAGE_LENGTH:
+        # Обрезаем по целой строке, чтобы не разорвать HTML тег
+        text = text[:MAX_MESSAGE_LENGTH - 2].rsplit("\n", 1)[0] + "\n…"
+    return text
+
+
+def section_title(title: str, total: int, limit: int) -> str:
+    if total > limit:
+        return f"\n<b>{title}</b> (последние {limit} из {total}):"
+    return f"\n<b>{title}:</b>"
+
+
+async def load_department_series(employee_directory, actions_store) -> HoursSeries:
+    """Объединенный ряд часов всех сотрудников (справочник должен быть загружен)"""
+    employees = employee_directory.all()
+    semaphore = asyncio.Semaphore(Config.STATS_FETCH_CONCURRENCY)
+
+    async def load(employee_id: int):
+        async with semaphore:
+            # Снимки всех сотрудников не кладутся в общий кэш
+            return await actions_store.get(employee_id, store=False)
+
+    snapshots = await asyncio.gather(*(load(employee.employee_id) for employee in employees))
+    return HoursSeries.merge(snapshot.series for snapshot in snapshots if snapshot)
+
+
+@router.message(Command("stats"), flags={"throttling": "report"})
+async def cmd_stats(
+        message: Message,
+        command: CommandObject,
+        employee: Employee = None,
+        is_admin: bool = False,
+        employee_directory=None,
+        actions_store=None
+):
+    """Статистика часов за период: /stats [с] [по]"""
+    if not employee:
+        await message.answer("❌ Вы не авторизованы. Используйте /start")
+        return
+
+    args = command.args.split() if command.args else []
+    department = bool(args) and args[0].lower() == "all"
+    if department:
+        if not is_admin:
+            await message.answer("❌ Статистика по всем сотрудникам доступна только администраторам.")
+            return
+        args = args[1:]
+
+    try:
+        today = date.today()
+        start = parse_date(args[0]) if len(args) > 0 else date(today.year, 1, 1)
+        end = parse_date(args[1]) if len(args) > 1 else today
+    except ValueError:
+        await message.answer(STATS_USAGE)
+        return
+    if len(args) > 2 or start > end:
+        await message.answer(STATS_USAGE)
+        return
+
+    if department:
+        if not await employee_directory.ready():
+            await message.answer("❌ Справочник сотрудников сейчас недоступен, попробуйте позже.")
+            return
+        series = await load_department_series(employee_directory, actions_store)
+        title = f"Статистика по всем сотрудникам ({len(series)} записей)"
+    else:
+        snapshot = await actions_store.get(employee.employee_id)
+        if not snapshot:
+            await message.answer("📊 У вас пока нет записей о действиях.")
+            return
+        series = snapshot.series
+        title = "Ваша статистика часов"
+
+    await message.answer(render_stats(series, start, end, title), parse_mode="HTML")
@@ -0,0 +1,22 @@
+from aiogram.filters.callback_data import CallbackData
+
+
+class ActionsPageCallback(CallbackData, prefix="ap"):
+    """Переход между страницами истории действий"""
+    page: int
+
+
+class DaysOffPageCallback(CallbackData, prefix="dp"):
+    """Переход между страницами списка выходных"""
+    page: int
+
+
+class DocumentCallback(CallbackData, prefix="d"):
+    """Запрос справки: id действия и версия его содержимого"""
+    action_id: int
+    version: str
+
+
+class EmployeeCallback(CallbackData, prefix="e"):
+    """Выбор сотрудника в результатах поиска"""
+    employee_id: int
@@ -1,7 +1,10 @@
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import ReplyKeyboardBuilder, InlineKeyboardBuilder
 
-def get_employee_menu() -> ReplyKeyboardMarkup:
+from bot.keyboards.callbacks import ActionsPageCallback, DaysOffPageCallback, DocumentCallback, EmployeeCallback
+from bot.services.documents import document_version
+
+def get_employee_menu(is_admin: bool = False) -> ReplyKeyboardMarkup:
     """Главное меню сотрудника"""
     builder = ReplyKeyboardBuilder()
     builder.row(
@@ -12,6 +15,14 @@ def get_employee_menu() -> ReplyKeyboardMarkup:
         KeyboardButton(text="📅 Мои выходные"),
         KeyboardButton(text="👤 Профиль")
     )
+    if is_admin:
+        builder.row(KeyboardButton(text="➕ Оформить переработку"))
+    return builder.as_markup(resize_keyboard=True)
+
+def get_cancel_menu() -> ReplyKeyboardMarkup:
+    """Клавиатура с кнопкой отмены"""
+    builder = ReplyKeyboardBuilder()
+    builder.row(KeyboardButton(text="❌ Отмена"))
     return builder.as_markup(resize_keyboard=True)
 
 def get_profile_menu() -> ReplyKeyboardMarkup:
@@ -21,12 +32,58 @@ def get_profile_menu() -> ReplyKeyboardMarkup:
     builder.row(KeyboardButton(text="◀️ Назад"))
     return builder.as_markup(resize_keyboard=True)
 
-def get_days_off_inline(actions: list) -> InlineKeyboardMarkup:
-    """Инлайн клавиатура с выходными днями"""
+def get_days_off_inline(actions: list, page: int = 0, page_size: int = 10) -> InlineKeyboardMarkup:
+    """Инлайн клавиатура с выходными днями (одна страница)"""
+    builder = InlineKeyboardBuilder()
+    total = max(1, (len(actions) + page_size - 1) // page_size)
+    for action in actions[page * page_size:(page + 1) * page_size]:
+        builder.row(InlineKeyboardButton(
+            text=f"📅 {action.date_action} ({action.action_type_name})",
+            callback_data=DocumentCallback(
+                action_id=action.action_id, version=document_version(action)
+            ).pack()
+        ))
+
+    if total > 1:
+        buttons = []
+        if page > 0:
+            buttons.append(InlineKeyboardButton(
+                text="◀️", callback_data=DaysOffPageCallback(page=page - 1).pack()
+            ))
+        buttons.append(InlineKeyboardButton(
+            text=f"{page + 1}/{total}", callback_data=DaysOffPageCallback(page=page).pack()
+        ))
+        if page < total - 1:
+            buttons.append(InlineKeyboardButton(
+                text="▶️", callback_data=DaysOffPageCallback(page=page + 1).pack()
+            ))
+        builder.row(*buttons)
+    return builder.as_markup()
+
+def get_actions_pager(page: int, total: int) -> InlineKeyboardMarkup:
+    """Инлайн клавиатура для листания истории действий"""
+    builder = InlineKeyboardBuilder()
+    buttons = []
+    if page > 0:
+        buttons.append(InlineKeyboardButton(
+            text="◀️", callback_data=ActionsPageCallback(page=page - 1).pack()
+        ))
+    buttons.append(InlineKeyboardButton(
+        text=f"{page + 1}/{total}", callback_data=ActionsPageCallback(page=page).pack()
+    ))
+    if page < total - 1:
+        buttons.append(InlineKeyboardButton(
+            text="▶️", callback_data=ActionsPageCallback(page=page + 1).pack()
+        ))
+    builder.row(*buttons)
+    return builder.as_markup()
+
+def get_employees_inline(employees: list) -> InlineKeyboardMarkup:
+    """Инлайн клавиатура для выбора сотрудника"""
     builder = InlineKeyboardBuilder()
-    for action in actions:
+    for employee in employees:
         builder.row(InlineKeyboardButton(
-            text=f"📅 {action['date_action']} ({action['action_type_name']})",
-            callback_data=f"document_{action['action_id']}"
+            text=f"👤 {employee.full_name} ({employee.login})",
+            callback_data=EmployeeCallback(employee_id=employee.employee_id).pack()
         ))
     return builder.as_markup()
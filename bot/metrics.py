@@ -0,0 +1,197 @@
+import logging
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = []
+    for name, value in zip(names, values):
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{name}="{value}"')
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        REGISTRY.register(self)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Монотонно растущий счетчик; может читаться функцией из чужих счетчиков при сборе метрик"""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._functions: List[Callable[[], Iterable[Tuple[Tuple, float]]]] = []
+
+    def inc(self, *labels, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def add_function(self, function: Callable[[], Iterable[Tuple[Tuple, float]]]):
+        """Добавить источник значений, вызываемый при каждом сборе; значения не должны убывать"""
+        self._functions.append(function)
+
+    def collect(self) -> List[str]:
+        samples = list(self._values.items())
+        for function in self._functions:
+            samples.extend(function())
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {value}" for labels, value in samples]
+
+
+class Gauge(_Metric):
+    """Текущее значение; может вычисляться функцией при сборе метрик"""
+    kind = "gauge"
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Sequence[str] = (),
+            function: Optional[Callable[[], Iterable[Tuple[Tuple, float]]]] = None
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._functions: List[Callable[[], Iterable[Tuple[Tuple, float]]]] = [function] if function else []
+
+    def inc(self, *labels, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels):
+        self._values[labels] = value
+
+    def add_function(self, function: Callable[[], Iterable[Tuple[Tuple, float]]]):
+        """Добавить источник значений, вызываемый при каждом сборе"""
+        self._functions.append(function)
+
+    def collect(self) -> List[str]:
+        samples = list(self._values.items())
+        for function in self._functions:
+            samples.extend(function())
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {value}" for labels, value in samples]
+
+
+class Histogram(_Metric):
+    """Гистограмма длительностей с фиксированными границами корзин"""
+    kind = "histogram"
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Sequence[str] = (),
+            buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [счетчики по корзинам (+Inf последняя), сумма]
+        self._values: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, *labels):
+        entry = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+
+    def collect(self) -> List[str]:
+        lines = []
+        for labels, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket_labels = _format_labels(self.labelnames, labels, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric):
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        """Метрики в текстовом формате Prometheus"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HANDLER_DURATION = Histogram(
+    "bot_handler_duration_seconds", "Handler execution time", ("handler",)
+)
+MIDDLEWARE_DURATION = Histogram(
+    "bot_middleware_duration_seconds", "Middleware own time, excluding the handler", ("middleware",)
+)
+UPDATE_DURATION = Histogram(
+    "bot_update_duration_seconds", "Time from receiving an update to the end of its processing", ("mode",)
+)
+API_REQUEST_DURATION = Histogram(
+    "bot_api_request_duration_seconds", "Backend API request time per endpoint template",
+    ("method", "route", "status"),
+)
+API_INFLIGHT = Gauge("bot_api_inflight_requests", "Backend API requests in flight")
+API_COALESCED = Counter(
+    "bot_api_coalesced_requests_total", "GET requests served by an identical in-flight request", ("route",)
+)
+CACHE_EVENTS = Counter("bot_cache_events_total", "Cache hits, misses and evictions", ("cache", "event"))
+CACHE_SIZE = Gauge("bot_cache_size", "Number of cache entries", ("cache",))
+DOCUMENT_FILE_ID_REUSE = Counter(
+    "bot_document_file_id_total", "Holiday documents sent by cached file_id or uploaded", ("result",)
+)
+BROADCAST_MESSAGES = Counter(
+    "bot_broadcast_messages_total", "Broadcast messages by delivery result", ("result",)
+)
+
+
+def register_cache(name: str, cache):
+    """Экспорт статистики TTLCache"""
+    CACHE_EVENTS.add_function(lambda: [
+        ((name, "hit"), cache.hits),
+        ((name, "miss"), cache.misses),
+        ((name, "eviction"), cache.evictions),
+    ])
+    CACHE_SIZE.add_function(lambda: [((name,), len(cache))])
+
+
+async def start_metrics_server(host: str, port: int) -> web.AppRunner:
+    """HTTP сервер с эндпоинтом /metrics"""
+
+    async def handle(request: web.Request) -> web.Response:
+        return web.Response(text=REGISTRY.render(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"Metrics available at http://{host}:{port}/metrics")
+    return runner
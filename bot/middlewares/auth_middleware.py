@@ -1,35 +1,68 @@
-from typing import Callable, Dict, Any, Awaitable
+import time
+from typing import Callable, Dict, Any, Awaitable, Optional
 from aiogram import BaseMiddleware
-from aiogram.types import TelegramObject, Message, CallbackQuery
+from aiogram.dispatcher.flags import get_flag
+from aiogram.types import TelegramObject, Message, CallbackQuery, InlineQuery
+
+from bot.config import Config
+from bot.metrics import MIDDLEWARE_DURATION
+from bot.models import Employee
+from bot.services.cache import TTLCache, MISSING
 
 
 class AuthMiddleware(BaseMiddleware):
-    """Middleware для проверки авторизации"""
+    """Middleware для проверки авторизации
+
+    Сотрудник загружается до вызова хендлера, если у хендлера нет флага
+    employee=False; хендлерам с этим флагом employee не передается.
+    """
 
-    def __init__(self, api_client):
+    def __init__(self, api_client, employee_cache: TTLCache = None):
         self.api_client = api_client
+        # Пустой TTLCache ложен (__len__), поэтому сравнение с None
+        if employee_cache is None:
+            employee_cache = TTLCache(
+                maxsize=Config.EMPLOYEE_CACHE_SIZE,
+                ttl=Config.EMPLOYEE_CACHE_TTL,
+                negative_ttl=Config.EMPLOYEE_CACHE_NEGATIVE_TTL,
+            )
+        self.employee_cache = employee_cache
         super().__init__()
 
+    async def get_employee(self, tg_id: int) -> Optional[Employee]:
+        """Получить сотрудника по tg_id с учетом кэша"""
+        employee = self.employee_cache.get(tg_id)
+        if employee is MISSING:
+            employee = await self.api_client.get_employee_by_tg_id(tg_id)
+            self.employee_cache.set(tg_id, employee)
+        return employee
+
     async def __call__(
             self,
             handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
             event: TelegramObject,
             data: Dict[str, Any]
     ) -> Any:
-        # Получаем user из Message или CallbackQuery
+        # Получаем user из Message, CallbackQuery или InlineQuery
         if isinstance(event, Message):
             user = event.from_user
-        elif isinstance(event, CallbackQuery):
+        elif isinstance(event, (CallbackQuery, InlineQuery)):
             user = event.from_user
         else:
             return await handler(event, data)
 
+        # Хендлеру сотрудник не нужен - не обращаемся к backend
+        if not get_flag(data, "employee", default=True):
+            return await handler(event, data)
+
         # Проверяем авторизацию
-        employee = await self.api_client.get_employee_by_tg_id(user.id)
+        started = time.perf_counter()
+        employee = await self.get_employee(user.id)
+        MIDDLEWARE_DURATION.observe(time.perf_counter() - started, "auth")
 
         # Добавляем данные в контекст
         data["employee"] = employee
         data["is_authorized"] = employee is not None
-        data["is_admin"] = employee.get("role_id") == 1 if employee else False
+        data["is_admin"] = employee.is_admin if employee else False
 
         return await handler(event, data)
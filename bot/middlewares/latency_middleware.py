@@ -0,0 +1,66 @@
+import logging
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, Dict, Any, Awaitable, Iterable
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from bot.metrics import UPDATE_DURATION
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(samples: Iterable[float], q: float) -> float:
+    """Перцентиль q (0..1) по выборке"""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class LatencyMiddleware(BaseMiddleware):
+    """Замер задержки обработки обновлений для сравнения polling и webhook
+
+    processing - от получения обновления ботом (в webhook режиме - от
+    HTTP запроса Telegram, включая ожидание в очереди) до конца обработки.
+    end_to_end - от отправки сообщения пользователем (Message.date,
+    точность 1 с) до конца обработки, включая задержку доставки.
+    """
+
+    def __init__(self, mode: str, report_every: int = 1000, window: int = 10000):
+        self.mode = mode
+        self.report_every = report_every
+        self.processing = deque(maxlen=window)
+        self.end_to_end = deque(maxlen=window)
+        self.count = 0
+        super().__init__()
+
+    async def __call__(
+            self,
+            handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+            event: TelegramObject,
+            data: Dict[str, Any]
+    ) -> Any:
+        received_at = data.get("received_at") or time.monotonic()
+        try:
+            return await handler(event, data)
+        finally:
+            elapsed = time.monotonic() - received_at
+            self.processing.append(elapsed)
+            UPDATE_DURATION.observe(elapsed, self.mode)
+            if isinstance(event, Update) and event.message:
+                self.end_to_end.append((datetime.now(timezone.utc) - event.message.date).total_seconds())
+            self.count += 1
+            if self.report_every and self.count % self.report_every == 0:
+                logger.info(self.summary())
+
+    def summary(self) -> str:
+        return (
+            f"Update latency ({self.mode}, last {len(self.processing)}): "
+            f"processing p50={percentile(self.processing, 0.5) * 1000:.1f}ms "
+            f"p99={percentile(self.processing, 0.99) * 1000:.1f}ms; "
+            f"end-to-end p50={percentile(self.end_to_end, 0.5):.2f}s "
+            f"p99={percentile(self.end_to_end, 0.99):.2f}s"
+        )
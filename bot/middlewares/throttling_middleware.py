@@ -0,0 +1,115 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Awaitable, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.flags import get_flag
+from aiogram.types import TelegramObject, Message, CallbackQuery
+
+from bot.metrics import MIDDLEWARE_DURATION
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated_at", "notified")
+
+    def __init__(self, capacity: float, now: float):
+        self.tokens = capacity
+        self.updated_at = now
+        self.notified = False
+
+    def consume(self, rate: float, capacity: float, now: float) -> bool:
+        """Взять один токен, если он есть"""
+        self.tokens = min(capacity, self.tokens + (now - self.updated_at) * rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """Ограничение частоты запросов пользователя и подавление повторных нажатий
+
+    Класс действия задается флагом хендлера throttling (по умолчанию
+    "default"); для каждого пользователя и класса ведется свое ведро
+    токенов. Повтор того же нажатия инлайн кнопки отбрасывается, пока
+    первое обрабатывается и еще duplicate_window секунд после. Окно
+    отсчитывается от конца обработки: при упорядоченной обработке
+    обновлений пользователя (очереди, процессы) повтор доходит до
+    хендлера только после завершения первого нажатия.
+    """
+
+    def __init__(self, limits: Dict[str, Tuple[float, float]], max_buckets: int = 100000,
+                 duplicate_window: float = 2.0):
+        # Класс действия -> (токенов в секунду, размер ведра)
+        self.limits = limits
+        self.max_buckets = max_buckets
+        self.duplicate_window = duplicate_window
+        self._buckets: "OrderedDict[Tuple[int, str], TokenBucket]" = OrderedDict()
+        # (пользователь, данные кнопки) -> до какого момента повтор отбрасывается
+        # (inf - нажатие еще обрабатывается)
+        self._pressed: "OrderedDict[Tuple[int, str], float]" = OrderedDict()
+        super().__init__()
+
+    def _is_duplicate(self, key: Tuple[int, str], now: float) -> bool:
+        # Записи добавляются по возрастанию времени: протухшие - в начале
+        while self._pressed:
+            until = next(iter(self._pressed.values()))
+            if until > now and len(self._pressed) <= self.max_buckets:
+                break
+            self._pressed.popitem(last=False)
+        return self._pressed.get(key, 0.0) > now
+
+    def _allow(self, user_id: int, action: str) -> Tuple[bool, TokenBucket]:
+        rate, capacity = self.limits.get(action) or self.limits["default"]
+        now = time.monotonic()
+        key = (user_id, action)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(capacity, now)
+            # Вытесненное ведро равносильно полному, поэтому вытеснение безопасно
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket.consume(rate, capacity, now), bucket
+
+    async def __call__(
+            self,
+            handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+            event: TelegramObject,
+            data: Dict[str, Any]
+    ) -> Any:
+        if not isinstance(event, (Message, CallbackQuery)) or event.from_user is None:
+            return await handler(event, data)
+
+        started = time.perf_counter()
+        user_id = event.from_user.id
+        pressed_key = (user_id, event.data) if isinstance(event, CallbackQuery) else None
+        if pressed_key is not None and self._is_duplicate(pressed_key, time.monotonic()):
+            await event.answer("⏳ Запрос уже обрабатывается, подождите...")
+            return None
+
+        allowed, bucket = self._allow(user_id, get_flag(data, "throttling", default="default"))
+        if not allowed:
+            # Предупреждаем один раз, пока ведро не пополнится
+            if not bucket.notified:
+                bucket.notified = True
+                await event.answer("⏳ Слишком много запросов, подождите немного.")
+            elif isinstance(event, CallbackQuery):
+                # Убираем индикатор загрузки на кнопке
+                await event.answer()
+            return None
+        bucket.notified = False
+        MIDDLEWARE_DURATION.observe(time.perf_counter() - started, "throttling")
+
+        if pressed_key is None:
+            return await handler(event, data)
+
+        self._pressed[pressed_key] = float("inf")
+        self._pressed.move_to_end(pressed_key)
+        try:
+            return await handler(event, data)
+        finally:
+            self._pressed[pressed_key] = time.monotonic() + self.duplicate_window
+            self._pressed.move_to_end(pressed_key)
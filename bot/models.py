@@ -0,0 +1,106 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+
+
+@dataclass(slots=True)
+class Post:
+    """Должность"""
+    post_id: Optional[int]
+    name_post: str
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> Optional["Post"]:
+        if not data:
+            return None
+        return cls(post_id=data.get("post_id"), name_post=data.get("name_post", ""))
+
+
+@dataclass(slots=True)
+class Otdel:
+    """Отдел"""
+    otdel_id: Optional[int]
+    name_otdel: str
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> Optional["Otdel"]:
+        if not data:
+            return None
+        return cls(otdel_id=data.get("otdel_id"), name_otdel=data.get("name_otdel", ""))
+
+
+@dataclass(slots=True)
+class Employee:
+    """Сотрудник"""
+    employee_id: int
+    surname: str
+    name: str
+    patronymic: str
+    login: str
+    role_id: int
+    tg_id: Optional[int]
+    idle_hours: int
+    post: Optional[Post]
+    otdel: Optional[Otdel]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Employee":
+        return cls(
+            employee_id=data["employee_id"],
+            surname=data.get("surname", ""),
+            name=data.get("name", ""),
+            patronymic=data.get("patronymic", ""),
+            login=data.get("login", ""),
+            role_id=data.get("role_id"),
+            tg_id=data.get("tg_id"),
+            idle_hours=data.get("idle_hours") or 0,
+            post=Post.from_dict(data.get("post")),
+            otdel=Otdel.from_dict(data.get("otdel")),
+        )
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role_id == 1
+
+    @property
+    def role_name(self) -> str:
+        return "Администратор" if self.is_admin else "Сотрудник"
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.surname} {self.name} {self.patronymic}"
+
+    @property
+    def post_name(self) -> Optional[str]:
+        return self.post.name_post if self.post else None
+
+    @property
+    def otdel_name(self) -> Optional[str]:
+        return self.otdel.name_otdel if self.otdel else None
+
+
+@dataclass(slots=True)
+class Action:
+    """Действие сотрудника (переработка, выходной и т.п.); дата разобрана при создании"""
+    action_id: int
+    employee_id: int
+    date_action: date
+    hours: int
+    actiontype_id: int
+    action_type_name: str
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Action":
+        return cls(
+            action_id=data["action_id"],
+            employee_id=data.get("employee_id"),
+            date_action=date.fromisoformat(data["date_action"]),
+            hours=data.get("hours", 0),
+            actiontype_id=data.get("actiontype_id"),
+            action_type_name=data.get("action_type_name", ""),
+        )
+
+    @property
+    def is_day_off(self) -> bool:
+        """Является ли действие выходным днем"""
+        return "выходной" in self.action_type_name.lower() or self.actiontype_id == 1
@@ -0,0 +1,105 @@
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from bot.models import Action
+from bot.services.analytics import HoursSeries
+from bot.services.cache import TTLCache, MISSING
+
+
+class ActionsSnapshot:
+    """Снимок истории действий сотрудника с заранее построенными индексами"""
+
+    __slots__ = ("employee_id", "actions", "dates", "by_month", "hours_by_month", "days_off", "created_at",
+                 "page_size", "_pages", "_series", "views")
+
+    def __init__(self, employee_id: int, actions: List[Action], page_size: int = 20):
+        self.employee_id = employee_id
+        self.created_at = time.monotonic()
+        self.page_size = page_size
+        self._pages: Optional[List[Tuple[str, List[Action], bool]]] = None
+        self._series: Optional[HoursSeries] = None
+        # Готовые представления (клавиатуры и т.п.), живут вместе со снимком
+        self.views: Dict[Hashable, Any] = {}
+
+        # Даты уже разобраны в модели, история сортируется от новых к старым
+        self.actions = sorted(actions, key=lambda action: action.date_action, reverse=True)
+        self.dates = [action.date_action for action in self.actions]
+
+        by_month: Dict[str, List[Action]] = defaultdict(list)
+        hours_by_month: Dict[str, int] = defaultdict(int)
+        for date, action in zip(self.dates, self.actions):
+            month_key = f"{date.year:04d}-{date.month:02d}"
+            by_month[month_key].append(action)
+            hours_by_month[month_key] += action.hours
+
+        # Месяцы в порядке от новых к старым
+        self.by_month: Dict[str, List[Action]] = dict(by_month)
+        self.hours_by_month: Dict[str, int] = dict(hours_by_month)
+        self.days_off = [action for action in self.actions if action.is_day_off]
+
+    def __bool__(self) -> bool:
+        return bool(self.actions)
+
+    @property
+    def pages(self) -> List[Tuple[str, List[Action], bool]]:
+        """Страницы истории: (месяц, действия, продолжение месяца)
+
+        Страница не выходит за границы месяца и содержит не больше
+        page_size действий. Границы вычисляются один раз на снимок.
+        """
+        if self._pages is None:
+            pages = []
+            for month_key, month_actions in self.by_month.items():
+                for start in range(0, len(month_actions), self.page_size):
+                    pages.append((month_key, month_actions[start:start + self.page_size], start > 0))
+            self._pages = pages
+        return self._pages
+
+    @property
+    def series(self) -> HoursSeries:
+        """Колоночный ряд часов для аналитики, строится один раз на снимок"""
+        if self._series is None:
+            self._series = HoursSeries(
+                ((date.toordinal(), float(action.hours), action.actiontype_id)
+                 for date, action in zip(self.dates, self.actions)),
+                {action.actiontype_id: action.action_type_name for action in self.actions},
+            )
+        return self._series
+
+    def month_hours(self, month_key: Optional[str] = None) -> int:
+        """Сумма часов за месяц (по умолчанию текущий)"""
+        if month_key is None:
+            month_key = datetime.now().strftime("%Y-%m")
+        return self.hours_by_month.get(month_key, 0)
+
+
+class ActionsStore:
+    """Кэш снимков действий сотрудников с коротким TTL"""
+
+    def __init__(self, api_client, maxsize: int = 1024, ttl: float = 30.0, page_size: int = 20):
+        self.api_client = api_client
+        self.page_size = page_size
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, employee_id: int, store: bool = True) -> Optional[ActionsSnapshot]:
+        """Получить снимок действий сотрудника
+
+        store=False - для отчетов по всем сотрудникам: готовый снимок
+        берется из кэша, но новый в него не кладется и не вытесняет
+        снимки активных пользователей.
+        """
+        snapshot = self.cache.get(employee_id)
+        if snapshot is MISSING:
+            actions = await self.api_client.get_employee_actions(employee_id)
+            if actions is None:
+                return None
+            snapshot = ActionsSnapshot(employee_id, actions, page_size=self.page_size)
+            if store:
+                self.cache.set(employee_id, snapshot)
+        return snapshot
+
+    def invalidate(self, employee_id: int):
+        """Сбросить снимок после изменения действий сотрудника"""
+        self.cache.invalidate(employee_id)
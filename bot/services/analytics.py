@@ -0,0 +1,114 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import Dict, Iterable, List, Tuple
+
+
+def _next_month(day: date) -> date:
+    """Первое число следующего месяца"""
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def _month_starts(start: date, end: date) -> List[date]:
+    """Первые числа месяцев, пересекающихся с интервалом [start, end]"""
+    months = []
+    current = date(start.year, start.month, 1)
+    while current <= end:
+        months.append(current)
+        current = _next_month(current)
+    return months
+
+
+class _Column:
+    """Отсортированные даты (ordinal) и префиксные суммы часов"""
+
+    __slots__ = ("ordinals", "prefix")
+
+    def __init__(self, ordinals: array, hours: array):
+        self.ordinals = ordinals
+        self.prefix = array("d", accumulate(hours, initial=0.0))
+
+    def total(self, start: int, end: int) -> float:
+        """Сумма часов за даты start..end включительно, O(log n)"""
+        lo = bisect_left(self.ordinals, start)
+        hi = bisect_right(self.ordinals, end)
+        return self.prefix[hi] - self.prefix[lo] if hi > lo else 0.0
+
+
+class HoursSeries:
+    """Колоночное представление истории действий для агрегации часов
+
+    Даты хранятся как ordinal, часы и типы - в отдельных массивах.
+    Любая сумма по интервалу дат считается через двоичный поиск и
+    префиксные суммы, поэтому разбивка по месяцам, кварталам и скользящим
+    окнам не требует повторного прохода по всем действиям.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[int, float, int]], type_names: Dict[int, str] = None):
+        rows = sorted(rows)
+        self.ordinals = array("l", (row[0] for row in rows))
+        self.hours = array("d", (row[1] for row in rows))
+        self.types = array("l", (row[2] for row in rows))
+        self.type_names = type_names or {}
+
+        self._all = _Column(self.ordinals, self.hours)
+        by_type: Dict[int, Tuple[array, array]] = {}
+        for ordinal, hours, actiontype_id in rows:
+            ordinals, type_hours = by_type.setdefault(actiontype_id, (array("l"), array("d")))
+            ordinals.append(ordinal)
+            type_hours.append(hours)
+        self._by_type = {type_id: _Column(*columns) for type_id, columns in by_type.items()}
+
+    @classmethod
+    def merge(cls, series: Iterable["HoursSeries"]) -> "HoursSeries":
+        """Объединить ряды нескольких сотрудников"""
+        rows = []
+        type_names = {}
+        for item in series:
+            rows.extend(zip(item.ordinals, item.hours, item.types))
+            type_names.update(item.type_names)
+        return cls(rows, type_names)
+
+    def __len__(self) -> int:
+        return len(self.ordinals)
+
+    def total(self, start: date, end: date) -> float:
+        """Сумма часов за период"""
+        return self._all.total(start.toordinal(), end.toordinal())
+
+    def by_month(self, start: date, end: date) -> Dict[str, float]:
+        """Суммы по месяцам периода (ключ YYYY-MM), пустые месяцы пропускаются"""
+        result = {}
+        for month_start in _month_starts(start, end):
+            month_end = _next_month(month_start) - timedelta(days=1)
+            total = self._all.total(max(month_start, start).toordinal(), min(month_end, end).toordinal())
+            if total:
+                result[f"{month_start.year:04d}-{month_start.month:02d}"] = total
+        return result
+
+    def by_quarter(self, start: date, end: date) -> Dict[str, float]:
+        """Суммы по кварталам периода (ключ YYYY-Qn)"""
+        result: Dict[str, float] = {}
+        for month, total in self.by_month(start, end).items():
+            year, month_number = month.split("-")
+            key = f"{year}-Q{(int(month_number) - 1) // 3 + 1}"
+            result[key] = result.get(key, 0.0) + total
+        return result
+
+    def by_type(self, start: date, end: date) -> Dict[str, float]:
+        """Суммы по типам действий"""
+        result = {}
+        for type_id, column in self._by_type.items():
+            total = column.total(start.toordinal(), end.toordinal())
+            if total:
+                result[self.type_names.get(type_id, str(type_id))] = total
+        return result
+
+    def rolling(self, end: date, days: int) -> float:
+        """Сумма часов за последние days дней, включая end"""
+        return self.total(end - timedelta(days=days - 1), end)
+
+    def year_to_date(self, end: date) -> float:
+        """Сумма часов с начала года до end"""
+        return self.total(date(end.year, 1, 1), end)
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramBadRequest, TelegramForbiddenError, TelegramNetworkError, TelegramRetryAfter
+)
+
+from bot.metrics import BROADCAST_MESSAGES
+
+logger = logging.getLogger(__name__)
+
+# Итог доставки: sent, blocked (бот заблокирован, чат удален) или failed
+OnDelivered = Callable[[str], Awaitable[None]]
+
+
+class Broadcaster:
+    """Общая очередь рассылки с ограничением частоты отправки
+
+    Сообщения отправляются не чаще rate в секунду в сумме и не чаще
+    одного за chat_interval секунд в один чат. При RetryAfter вся
+    очередь приостанавливается на указанное Telegram время.
+    """
+
+    def __init__(self, rate: float = 25, chat_interval: float = 1.0, workers: int = 8,
+                 retries: int = 3, maxsize: int = 1000):
+        self.bot: Optional[Bot] = None
+        self.interval = 1 / rate
+        self.chat_interval = chat_interval
+        self.workers = workers
+        self.retries = retries
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._lock = asyncio.Lock()
+        self._next_slot = 0.0
+        self._paused_until = 0.0
+        self._chat_ready: Dict[int, float] = {}
+        self._tasks = []
+
+    def start(self, bot: Bot):
+        self.bot = bot
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def send(self, chat_id: int, text: str, on_delivered: Optional[OnDelivered] = None):
+        """Поставить сообщение в очередь (ждет, если очередь заполнена)"""
+        await self._queue.put((chat_id, text, on_delivered))
+
+    async def join(self):
+        """Дождаться доставки всех поставленных сообщений"""
+        await self._queue.join()
+
+    async def _worker(self):
+        while True:
+            chat_id, text, on_delivered = await self._queue.get()
+            try:
+                result = await self._deliver(chat_id, text)
+                BROADCAST_MESSAGES.inc(result)
+                if on_delivered is not None:
+                    await on_delivered(result)
+            except Exception as e:
+                logger.exception(f"Broadcast to {chat_id} failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, chat_id: int, text: str) -> str:
+        for attempt in range(self.retries + 1):
+            await self._acquire(chat_id)
+            try:
+                await self.bot.send_message(chat_id, text, parse_mode="HTML")
+                return "sent"
+            except TelegramRetryAfter as e:
+                logger.warning(f"Broadcast flood limit, pausing for {e.retry_after}s")
+                self._paused_until = max(self._paused_until, time.monotonic() + e.retry_after)
+            except TelegramForbiddenError:
+                return "blocked"
+            except TelegramBadRequest as e:
+                if "chat not found" in str(e):
+                    return "blocked"
+                logger.error(f"Broadcast to {chat_id} rejected: {e}")
+                return "failed"
+            except TelegramNetworkError as e:
+                logger.warning(f"Broadcast to {chat_id} network error: {e}")
+                await asyncio.sleep(min(2 ** attempt, 30))
+        return "failed"
+
+    async def _acquire(self, chat_id: int):
+        """Дождаться своей очереди: сначала по чату, затем общий слот"""
+        chat_wait = self._chat_ready.get(chat_id, 0.0) - time.monotonic()
+        if chat_wait > 0:
+            await asyncio.sleep(chat_wait)
+
+        # Слоты выдаются по одному с шагом interval; ожидание под блокировкой
+        # сохраняет порядок и не дает воркерам отправить пачку разом
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot, self._paused_until)
+            self._next_slot = slot + self.interval
+            if slot > now:
+                await asyncio.sleep(slot - now)
+
+        now = time.monotonic()
+        self._chat_ready[chat_id] = now + self.chat_interval
+        if len(self._chat_ready) > 10000:
+            self._chat_ready = {chat: ready for chat, ready in self._chat_ready.items() if ready > now}
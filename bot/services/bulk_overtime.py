@@ -0,0 +1,157 @@
+import asyncio
+import csv
+import logging
+import random
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from bot.exceptions import APIUnavailableError, CircuitOpenError
+from bot.models import Employee
+from bot.services.dates import parse_date
+
+logger = logging.getLogger(__name__)
+
+MAX_HOURS = 24
+
+
+class OvertimeRow:
+    """Строка пакета: сотрудник, дата и часы"""
+
+    __slots__ = ("line", "employee", "date", "hours", "error")
+
+    def __init__(self, line: int, employee: Optional[Employee], date: Optional[str], hours: Optional[int],
+                 error: Optional[str] = None):
+        self.line = line
+        self.employee = employee
+        self.date = date
+        self.hours = hours
+        self.error = error
+
+
+class EmployeeResolver:
+    """Поиск сотрудника по ID, логину или ФИО"""
+
+    def __init__(self, employees: List[Employee]):
+        self._by_key: Dict[str, List[Employee]] = {}
+        for employee in employees:
+            keys = {
+                str(employee.employee_id),
+                (employee.login or "").lower(),
+                employee.full_name.lower(),
+                f"{employee.surname} {employee.name}".lower(),
+            }
+            for key in keys:
+                if key:
+                    self._by_key.setdefault(key, []).append(employee)
+
+    def resolve(self, reference: str) -> Tuple[Optional[Employee], Optional[str]]:
+        """Сотрудник или текст ошибки"""
+        matches = self._by_key.get(" ".join(reference.lower().split()), [])
+        if not matches:
+            return None, f"сотрудник «{reference}» не найден"
+        if len(matches) > 1:
+            return None, f"сотрудник «{reference}» неоднозначен, укажите логин"
+        return matches[0], None
+
+
+def parse_table(text: str, resolver: EmployeeResolver) -> List[OvertimeRow]:
+    """Разбор таблицы «сотрудник; дата; часы» (CSV, TSV или через ;)"""
+    # Номера строк - как в исходном тексте, вместе с пустыми строками
+    lines = [(line_no, line) for line_no, line in enumerate(text.splitlines(), start=1) if line.strip()]
+    if not lines:
+        return []
+    first_line = lines[0][0]
+    delimiter = max(";\t,", key=lambda candidate: lines[0][1].count(candidate))
+
+    rows = []
+    seen = set()
+    for line_no, line in lines:
+        fields = [field.strip() for field in next(csv.reader([line], delimiter=delimiter))]
+        if len(fields) != 3:
+            rows.append(OvertimeRow(line_no, None, None, None, "ожидается 3 столбца: сотрудник, дата, часы"))
+            continue
+        reference, raw_date, raw_hours = fields
+
+        try:
+            hours = int(raw_hours)
+        except ValueError:
+            # Первая строка с нечисловыми часами - заголовок таблицы
+            if line_no == first_line:
+                continue
+            rows.append(OvertimeRow(line_no, None, None, None, f"часы «{raw_hours}» не число"))
+            continue
+        if not 0 < hours <= MAX_HOURS:
+            rows.append(OvertimeRow(line_no, None, None, None, f"часы должны быть от 1 до {MAX_HOURS}"))
+            continue
+
+        try:
+            date = parse_date(raw_date).isoformat()
+        except ValueError:
+            rows.append(OvertimeRow(line_no, None, None, None, f"дата «{raw_date}» не распознана"))
+            continue
+
+        employee, error = resolver.resolve(reference)
+        if error:
+            rows.append(OvertimeRow(line_no, None, date, hours, error))
+            continue
+
+        key = (employee.employee_id, date)
+        if key in seen:
+            rows.append(OvertimeRow(line_no, employee, date, hours, "повтор строки для этого сотрудника и даты"))
+            continue
+        seen.add(key)
+        rows.append(OvertimeRow(line_no, employee, date, hours))
+    return rows
+
+
+def was_not_sent(error: APIUnavailableError) -> bool:
+    """Запрос точно не дошел до backend: автомат разомкнут или соединение не установлено
+
+    После таймаута, обрыва соединения или ответа 5xx запись могла быть
+    создана, поэтому повтор такого POST может ее задвоить.
+    """
+    return isinstance(error, CircuitOpenError) or isinstance(error.__cause__, aiohttp.ClientConnectorError)
+
+
+async def submit_rows(
+        api_client,
+        rows: List[OvertimeRow],
+        concurrency: int = 5,
+        retries: int = 2,
+        on_progress: Callable[[int, int], Awaitable[None]] = None
+) -> List[OvertimeRow]:
+    """Отправка корректных строк с ограничением параллельности и повторами
+
+    Повторяются только запросы, которые не дошли до backend (was_not_sent).
+    Возвращает те же строки; у неудачных заполняется error.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    pending = [row for row in rows if row.error is None]
+    done = 0
+
+    async def submit(row: OvertimeRow):
+        nonlocal done
+        async with semaphore:
+            for attempt in range(retries + 1):
+                try:
+                    result = await api_client.create_overtime(row.employee.employee_id, row.hours, row.date)
+                    if result is None:
+                        row.error = "отклонено сервером"
+                    break
+                except APIUnavailableError as e:
+                    if not was_not_sent(e):
+                        logger.error(f"Overtime row {row.line} result unknown: {e}")
+                        row.error = "результат неизвестен, проверьте вручную"
+                        break
+                    if attempt == retries:
+                        row.error = "сервис недоступен"
+                        break
+                    logger.warning(f"Retrying overtime row {row.line}: {e}")
+                    await asyncio.sleep(random.uniform(0, 0.5 * 2 ** attempt))
+        done += 1
+        if on_progress is not None:
+            await on_progress(done, len(pending))
+
+    await asyncio.gather(*(submit(row) for row in pending))
+    return rows
@@ -0,0 +1,13 @@
+from datetime import date, datetime
+
+DATE_FORMATS = ("%Y-%m-%d", "%d.%m.%Y")
+
+
+def parse_date(value: str) -> date:
+    """Разбор даты в формате ГГГГ-ММ-ДД или ДД.ММ.ГГГГ"""
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value.strip(), fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(value)
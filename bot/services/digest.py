@@ -0,0 +1,224 @@
+import asyncio
+import calendar
+import logging
+import sqlite3
+import time
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Set
+
+from aiogram import Bot
+
+from bot.models import Employee
+from bot.services.broadcast import Broadcaster
+
+logger = logging.getLogger(__name__)
+
+# Сколько месяцев хранится история рассылок
+KEEP_PERIODS = 12
+# Сколько раз сообщение отправляется заново после неудачной доставки (failed)
+MAX_ATTEMPTS = 3
+
+
+def previous_month(day: date) -> str:
+    """Ключ прошлого месяца в формате ГГГГ-ММ"""
+    if day.month == 1:
+        return f"{day.year - 1:04d}-12"
+    return f"{day.year:04d}-{day.month - 1:02d}"
+
+
+def render_digest(employee: Employee, period: str, month_hours: int) -> str:
+    """Текст ежемесячной сводки по часам"""
+    month_name = datetime.strptime(period, "%Y-%m").strftime("%B %Y")
+    return (
+        f"📬 <b>Итоги за {month_name}</b>\n\n"
+        f"📅 Переработано: <b>{month_hours}</b> ч.\n"
+        f"💤 Неиспользованных часов: <b>{employee.idle_hours}</b> ч.\n\n"
+        f"ℹ️ Подробности - «⏰ Мои часы» и /stats."
+    )
+
+
+class DigestProgress:
+    """Ход рассылок в SQLite: после перезапуска рассылка продолжается с места остановки"""
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS digest_runs ("
+            " period TEXT PRIMARY KEY,"
+            " started_at REAL NOT NULL,"
+            " finished_at REAL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS digest_deliveries ("
+            " period TEXT NOT NULL,"
+            " employee_id INTEGER NOT NULL,"
+            " status TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 1,"
+            " delivered_at REAL NOT NULL,"
+            " PRIMARY KEY (period, employee_id))"
+        )
+        self.conn.commit()
+
+    def is_started(self, period: str) -> bool:
+        row = self.conn.execute("SELECT 1 FROM digest_runs WHERE period = ?", (period,)).fetchone()
+        return row is not None
+
+    def is_finished(self, period: str) -> bool:
+        row = self.conn.execute("SELECT finished_at FROM digest_runs WHERE period = ?", (period,)).fetchone()
+        return row is not None and row[0] is not None
+
+    def start(self, period: str):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO digest_runs (period, started_at) VALUES (?, ?)", (period, time.time())
+            )
+
+    def finish(self, period: str):
+        with self.conn:
+            self.conn.execute("UPDATE digest_runs SET finished_at = ? WHERE period = ?", (time.time(), period))
+            # Старые рассылки больше не нужны
+            self.conn.execute(
+                "DELETE FROM digest_deliveries WHERE period NOT IN"
+                " (SELECT period FROM digest_runs ORDER BY period DESC LIMIT ?)",
+                (KEEP_PERIODS,),
+            )
+
+    def delivered(self, period: str) -> Set[int]:
+        """Сотрудники, которым рассылка за период больше не нужна
+
+        Отправленные, заблокировавшие бота и те, кому отправить не удалось
+        MAX_ATTEMPTS раз; остальные неудачные доставки повторяются.
+        """
+        rows = self.conn.execute(
+            "SELECT employee_id FROM digest_deliveries WHERE period = ? AND (status != 'failed' OR attempts >= ?)",
+            (period, MAX_ATTEMPTS),
+        )
+        return {employee_id for employee_id, in rows}
+
+    def mark(self, period: str, employee_id: int, status: str):
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO digest_deliveries (period, employee_id, status, delivered_at) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT (period, employee_id) DO UPDATE SET"
+                " status = excluded.status, delivered_at = excluded.delivered_at, attempts = attempts + 1",
+                (period, employee_id, status, time.time()),
+            )
+
+    def close(self):
+        self.conn.close()
+
+
+class DigestScheduler:
+    """Ежемесячная рассылка сотрудникам итогов по часам за прошлый месяц
+
+    Рассылка начинается в день day месяца с hour часов. Список
+    сотрудников и их неиспользованные часы берутся одним запросом через
+    справочник, действия загружаются пачками по batch_size с общим
+    ограничением параллельности и не попадают в общий кэш. Сообщения
+    уходят через Broadcaster.
+    """
+
+    def __init__(self, broadcaster: Broadcaster, employee_directory, actions_store, progress: DigestProgress,
+                 day: int = 1, hour: int = 10, start_window: float = 1, check_interval: float = 300,
+                 batch_size: int = 50, fetch_concurrency: int = 10):
+        self.broadcaster = broadcaster
+        self.employee_directory = employee_directory
+        self.actions_store = actions_store
+        self.progress = progress
+        self.day = day
+        self.hour = hour
+        self.start_window = timedelta(days=start_window)
+        self.check_interval = check_interval
+        self.batch_size = batch_size
+        self.fetch_concurrency = fetch_concurrency
+        self._task: Optional[asyncio.Task] = None
+
+    def due_period(self, now: datetime) -> Optional[str]:
+        """Период, рассылка за который должна идти сейчас, или None
+
+        Новая рассылка начинается только в течение start_window после
+        дня day (в коротких месяцах - последнего дня месяца) hour часов:
+        запуск бота позже не рассылает устаревшую сводку. Начатая и не
+        законченная рассылка за прошлый месяц дорабатывается в любой день.
+        """
+        period = previous_month(now.date())
+        if self.progress.is_started(period):
+            return None if self.progress.is_finished(period) else period
+        day = min(self.day, calendar.monthrange(now.year, now.month)[1])
+        start = datetime(now.year, now.month, day, self.hour)
+        return period if start <= now < start + self.start_window else None
+
+    async def _loop(self):
+        while True:
+            try:
+                period = self.due_period(datetime.now())
+                if period is not None:
+                    await self.run(period)
+            except Exception as e:
+                logger.error(f"Digest error: {e}")
+            await asyncio.sleep(self.check_interval)
+
+    def start(self, bot: Bot):
+        if self._task is None:
+            self.broadcaster.start(bot)
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.broadcaster.stop()
+        self.progress.close()
+
+    async def run(self, period: str):
+        """Разослать сводку за период всем, кому она еще не отправлена"""
+        self.progress.start(period)
+        # Свежие неиспользованные часы всех сотрудников - одним запросом
+        await self.employee_directory.refresh()
+        if not await self.employee_directory.ready():
+            logger.warning(f"Digest {period}: employee directory unavailable, will retry")
+            return
+        delivered = self.progress.delivered(period)
+        recipients = [
+            employee for employee in self.employee_directory.all()
+            if employee.tg_id and employee.employee_id not in delivered
+        ]
+        logger.info(f"Digest {period}: {len(recipients)} recipients, {len(delivered)} already delivered")
+
+        semaphore = asyncio.Semaphore(self.fetch_concurrency)
+        complete = True
+        for start in range(0, len(recipients), self.batch_size):
+            if not await self._send_batch(period, recipients[start:start + self.batch_size], semaphore):
+                complete = False
+
+        await self.broadcaster.join()
+        # Если часть данных не загрузилась или сообщения не доставлены,
+        # период будет дослан при следующей проверке
+        delivered = self.progress.delivered(period)
+        if complete and all(employee.employee_id in delivered for employee in recipients):
+            self.progress.finish(period)
+            logger.info(f"Digest {period} finished")
+
+    async def _send_batch(self, period: str, employees: List[Employee], semaphore: asyncio.Semaphore) -> bool:
+        async def load(employee_id: int):
+            async with semaphore:
+                return await self.actions_store.get(employee_id, store=False)
+
+        snapshots = await asyncio.gather(
+            *(load(employee.employee_id) for employee in employees), return_exceptions=True
+        )
+        complete = True
+        for employee, snapshot in zip(employees, snapshots):
+            if isinstance(snapshot, Exception):
+                logger.warning(f"Digest {period}: actions of employee {employee.employee_id} unavailable: {snapshot}")
+                complete = False
+                continue
+            text = render_digest(employee, period, snapshot.month_hours(period) if snapshot else 0)
+            await self.broadcaster.send(employee.tg_id, text, self._on_delivered(period, employee.employee_id))
+        return complete
+
+    def _on_delivered(self, period: str, employee_id: int):
+        async def on_delivered(result: str):
+            self.progress.mark(period, employee_id, result)
+        return on_delivered
@@ -0,0 +1,194 @@
+import asyncio
+import heapq
+import logging
+from bisect import bisect_left
+from typing import Dict, List, Optional, Set, Tuple
+
+from bot.models import Employee
+
+logger = logging.getLogger(__name__)
+
+NAME_FIELDS = ("surname", "name", "patronymic", "login")
+
+
+def _normalize(value: Optional[str]) -> str:
+    return " ".join((value or "").lower().replace("ё", "е").split())
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class _Indexes:
+    """Неизменяемый набор индексов; при обновлении строится новый и подменяется целиком"""
+
+    def __init__(self, employees: List[Employee]):
+        self.by_id: Dict[int, Employee] = {}
+        self.by_tg_id: Dict[int, Employee] = {}
+        self.by_otdel: Dict[str, List[Employee]] = {}
+        self.by_post: Dict[str, List[Employee]] = {}
+        # Отсортированные пары (слово, employee_id) для поиска по префиксу
+        self.tokens: List[Tuple[str, int]] = []
+        # Триграмма -> сотрудники, в тексте которых она встречается
+        self.trigrams: Dict[str, Set[int]] = {}
+        self.texts: Dict[int, str] = {}
+
+        for employee in sorted(employees, key=lambda e: (_normalize(e.surname), _normalize(e.name))):
+            employee_id = employee.employee_id
+            self.by_id[employee_id] = employee
+            if employee.tg_id:
+                self.by_tg_id[employee.tg_id] = employee
+            otdel = _normalize(employee.otdel_name)
+            if otdel:
+                self.by_otdel.setdefault(otdel, []).append(employee)
+            post = _normalize(employee.post_name)
+            if post:
+                self.by_post.setdefault(post, []).append(employee)
+
+            words = [_normalize(getattr(employee, field)) for field in NAME_FIELDS]
+            for word in words:
+                if word:
+                    self.tokens.append((word, employee_id))
+            text = " ".join(word for word in words if word)
+            self.texts[employee_id] = text
+            for trigram in _trigrams(text):
+                self.trigrams.setdefault(trigram, set()).add(employee_id)
+        self.tokens.sort()
+        self.order = {employee_id: position for position, employee_id in enumerate(self.by_id)}
+
+    def prefix(self, word: str, limit: Optional[int] = None) -> Dict[int, None]:
+        """Сотрудники, у которых одно из слов ФИО или логин начинается с word
+
+        Результат упорядочен по найденному слову; с limit обход
+        останавливается, как только набрано нужное число сотрудников.
+        """
+        result: Dict[int, None] = {}
+        position = bisect_left(self.tokens, (word,))
+        while position < len(self.tokens) and self.tokens[position][0].startswith(word):
+            result[self.tokens[position][1]] = None
+            if limit is not None and len(result) >= limit:
+                break
+            position += 1
+        return result
+
+    def substring(self, word: str) -> Set[int]:
+        """Сотрудники, в ФИО или логине которых встречается word"""
+        if len(word) < 3:
+            return set(self.prefix(word))
+        postings = sorted((self.trigrams.get(trigram, set()) for trigram in _trigrams(word)), key=len)
+        if not postings or not postings[0]:
+            return set()
+        candidates = set.intersection(*postings)
+        return {employee_id for employee_id in candidates if word in self.texts[employee_id]}
+
+
+class EmployeeDirectory:
+    """Справочник сотрудников в памяти с индексами для быстрого поиска
+
+    Список периодически перезагружается целиком в фоне; поиск и выборки
+    работают только с памятью и не обращаются к backend.
+    """
+
+    def __init__(self, api_client, refresh_interval: float = 300.0, ready_timeout: float = 5.0):
+        self.api_client = api_client
+        self.refresh_interval = refresh_interval
+        self.ready_timeout = ready_timeout
+        self._indexes = _Indexes([])
+        self._loaded = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def refresh(self):
+        """Полная перезагрузка списка сотрудников"""
+        employees = await self.api_client.get_all_employees()
+        if employees is None:
+            logger.warning("Employee directory refresh returned no data, keeping previous list")
+            return
+        # Построение индексов для тысяч сотрудников занимает заметное время,
+        # поэтому выполняется в потоке, не блокируя обработку обновлений
+        self._indexes = await asyncio.to_thread(_Indexes, employees)
+        self._loaded.set()
+        logger.info(f"Employee directory loaded: {len(employees)} employees")
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Employee directory refresh error: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def ready(self) -> bool:
+        """Дождаться первой загрузки (или загрузить сразу, если фон не запущен)
+
+        Ожидание ограничено ready_timeout; False - справочник не загружен,
+        вызывающий сообщает пользователю о недоступности.
+        """
+        if self._loaded.is_set():
+            return True
+        try:
+            if self._task is None:
+                await asyncio.wait_for(self.refresh(), self.ready_timeout)
+            else:
+                await asyncio.wait_for(self._loaded.wait(), self.ready_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Employee directory not loaded within {self.ready_timeout}s")
+        except Exception as e:
+            logger.error(f"Employee directory refresh error: {e}")
+        return self._loaded.is_set()
+
+    def __len__(self) -> int:
+        return len(self._indexes.by_id)
+
+    def all(self) -> List[Employee]:
+        return list(self._indexes.by_id.values())
+
+    def get(self, employee_id: int) -> Optional[Employee]:
+        return self._indexes.by_id.get(employee_id)
+
+    def by_tg_id(self, tg_id: int) -> Optional[Employee]:
+        return self._indexes.by_tg_id.get(tg_id)
+
+    def by_otdel(self, name: str) -> List[Employee]:
+        return self._indexes.by_otdel.get(_normalize(name), [])
+
+    def by_post(self, name: str) -> List[Employee]:
+        return self._indexes.by_post.get(_normalize(name), [])
+
+    def search(self, query: str, limit: int = 20) -> List[Employee]:
+        """Поиск по префиксу и подстроке ФИО и логина без учета регистра
+
+        Каждое слово запроса должно найтись у сотрудника. Совпадения по
+        началу слова идут раньше совпадений по подстроке.
+        """
+        indexes = self._indexes
+        words = _normalize(query).split()
+        if not words:
+            return []
+
+        # Совпадения по началу слов ранжируются выше совпадений по подстроке
+        if len(words) == 1:
+            ranked = list(indexes.prefix(words[0], limit))
+        else:
+            prefix_hits = set.intersection(*(set(indexes.prefix(word)) for word in words))
+            ranked = heapq.nsmallest(limit, prefix_hits, key=indexes.order.__getitem__)
+
+        if len(ranked) < limit:
+            matches = None
+            for word in words:
+                found = indexes.substring(word)
+                matches = found if matches is None else matches & found
+                if not matches:
+                    break
+            ranked += heapq.nsmallest(limit - len(ranked), (matches or set()).difference(ranked),
+                                      key=indexes.order.__getitem__)
+        return [indexes.by_id[employee_id] for employee_id in ranked]
@@ -0,0 +1,117 @@
+import hashlib
+import logging
+import sqlite3
+import time
+from typing import Dict, Optional, Tuple
+
+from bot.models import Action
+
+logger = logging.getLogger(__name__)
+
+# Поля действия, от которых зависит содержимое справки
+DOCUMENT_FIELDS = ("action_id", "employee_id", "date_action", "hours", "actiontype_id", "action_type_name")
+
+
+def document_version(action: Action) -> str:
+    """Короткий хэш содержимого действия для ключа кэша справки"""
+    payload = "|".join(str(getattr(action, field)) for field in DOCUMENT_FIELDS)
+    return hashlib.blake2s(payload.encode(), digest_size=4).hexdigest()
+
+
+class DocumentCache:
+    """Постоянное хранилище Telegram file_id отправленных справок
+
+    Ключ - action_id и версия содержимого действия. Записи старше max_age
+    удаляются, при превышении max_entries вытесняются давно не
+    использованные. Время использования копится в памяти и пишется
+    пачкой (не чаще раза в flush_interval секунд), чтобы попадание в
+    кэш не ждало записи на диск.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000, max_age: float = 30 * 24 * 3600,
+                 flush_interval: float = 60.0, flush_batch_size: int = 500):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+        # (action_id, version) -> время последнего использования, еще не записанное
+        self._touched: Dict[Tuple[int, str], float] = {}
+        self._flushed_at = time.monotonic()
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS document_files ("
+            " action_id INTEGER NOT NULL,"
+            " version TEXT NOT NULL,"
+            " file_id TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " PRIMARY KEY (action_id, version))"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS document_files_last_used ON document_files (last_used)")
+        self.conn.commit()
+
+    def get(self, action_id: int, version: str) -> Optional[str]:
+        """Получить file_id справки или None"""
+        row = self.conn.execute(
+            "SELECT file_id, created_at FROM document_files WHERE action_id = ? AND version = ?",
+            (action_id, version),
+        ).fetchone()
+        if row is None:
+            return None
+
+        now = time.time()
+        file_id, created_at = row
+        if now - created_at > self.max_age:
+            self.invalidate(action_id)
+            return None
+
+        self._touched[(action_id, version)] = now
+        if (len(self._touched) >= self.flush_batch_size
+                or time.monotonic() - self._flushed_at >= self.flush_interval):
+            with self.conn:
+                self._flush_touched()
+        return file_id
+
+    def _flush_touched(self):
+        """Записать накопленное время использования (внутри транзакции вызывающего)"""
+        if self._touched:
+            self.conn.executemany(
+                "UPDATE document_files SET last_used = ? WHERE action_id = ? AND version = ?",
+                [(used, action_id, version) for (action_id, version), used in self._touched.items()],
+            )
+            self._touched.clear()
+        self._flushed_at = time.monotonic()
+
+    def set(self, action_id: int, version: str, file_id: str):
+        """Сохранить file_id справки, заменив прежние версии"""
+        now = time.time()
+        with self.conn:
+            self.conn.execute("DELETE FROM document_files WHERE action_id = ?", (action_id,))
+            self.conn.execute(
+                "INSERT INTO document_files (action_id, version, file_id, created_at, last_used)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (action_id, version, file_id, now, now),
+            )
+            # Вытеснение по last_used должно видеть и недавние попадания
+            self._flush_touched()
+            self._evict(now)
+
+    def invalidate(self, action_id: int):
+        """Удалить справку при изменении действия"""
+        with self.conn:
+            self.conn.execute("DELETE FROM document_files WHERE action_id = ?", (action_id,))
+
+    def _evict(self, now: float):
+        self.conn.execute("DELETE FROM document_files WHERE created_at < ?", (now - self.max_age,))
+        (count,) = self.conn.execute("SELECT COUNT(*) FROM document_files").fetchone()
+        if count > self.max_entries:
+            self.conn.execute(
+                "DELETE FROM document_files WHERE rowid IN ("
+                " SELECT rowid FROM document_files ORDER BY last_used LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def close(self):
+        with self.conn:
+            self._flush_touched()
+        self.conn.close()
@@ -0,0 +1,134 @@
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Mapping, Optional, Set
+
+MAX_AGE_RE = re.compile(r"max-age\s*=\s*(\d+)")
+
+
+class CachedResponse:
+    """Декодированный ответ вместе с валидаторами для условного запроса"""
+
+    __slots__ = ("value", "etag", "last_modified", "expires_at", "size", "tags")
+
+    def __init__(self, value: Any, size: int, tags: Set[str]):
+        self.value = value
+        self.size = size
+        self.tags = tags
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.expires_at = 0.0
+
+    def update(self, headers: Mapping[str, str]):
+        """Обновить валидаторы и срок свежести по заголовкам ответа (200 или 304)"""
+        self.etag = headers.get("ETag", self.etag)
+        self.last_modified = headers.get("Last-Modified", self.last_modified)
+        self.expires_at = time.monotonic() + max_age(headers)
+
+    def fresh(self) -> bool:
+        return self.expires_at > time.monotonic()
+
+    def validators(self) -> Dict[str, str]:
+        """Заголовки условного запроса"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def max_age(headers: Mapping[str, str]) -> int:
+    """Срок свежести ответа из Cache-Control, с (0 - только с проверкой)"""
+    cache_control = headers.get("Cache-Control", "").lower()
+    if "no-cache" in cache_control:
+        return 0
+    match = MAX_AGE_RE.search(cache_control)
+    return int(match.group(1)) if match else 0
+
+
+def cacheable(headers: Mapping[str, str]) -> bool:
+    """Есть ли смысл сохранять ответ: он разрешен к хранению и его можно проверить или он свежий"""
+    if "no-store" in headers.get("Cache-Control", "").lower():
+        return False
+    return "ETag" in headers or "Last-Modified" in headers or max_age(headers) > 0
+
+
+class HTTPCache:
+    """LRU кэш GET ответов backend, ограниченный суммарным размером тел
+
+    Размер записи считается по длине тела ответа. Записи помечаются
+    тегами ресурсов; запись в ресурс сбрасывает все записи с его тегом.
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._data: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._by_tag: Dict[str, Set[Hashable]] = {}
+        # hits - ответы из кэша, в том числе revalidated (после 304);
+        # misses - ответы, тело которых пришлось загрузить
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+        # Растет при каждом сбросе по тегам: ответ на запрос, начатый до
+        # сброса, не сохраняется
+        self.generation = 0
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        entry = self._data.get(key)
+        if entry is not None:
+            self._data.move_to_end(key)
+        return entry
+
+    def set(self, key: Hashable, entry: CachedResponse):
+        """Сохранить ответ, вытеснив давно не использованные при превышении размера"""
+        self.invalidate(key)
+        if entry.size > self.max_bytes:
+            return
+        self._data[key] = entry
+        self.size += entry.size
+        for tag in entry.tags:
+            self._by_tag.setdefault(tag, set()).add(key)
+        while self.size > self.max_bytes:
+            oldest = next(iter(self._data))
+            self.invalidate(oldest)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return
+        self.size -= entry.size
+        for tag in entry.tags:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+    def invalidate_tags(self, tags: Iterable[str]):
+        """Сбросить все записи, помеченные любым из тегов"""
+        self.generation += 1
+        for tag in tags:
+            for key in list(self._by_tag.get(tag, ())):
+                self.invalidate(key)
+
+    def clear(self):
+        self._data.clear()
+        self._by_tag.clear()
+        self.size = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "bytes": self.size,
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
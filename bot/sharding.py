@@ -0,0 +1,220 @@
+import asyncio
+import logging
+import multiprocessing
+import queue
+import signal
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from aiogram import Bot, Dispatcher
+from aiogram.exceptions import TelegramNetworkError
+
+from bot.config import Config
+from bot.dispatcher import create_dispatcher, include_routers
+from bot.metrics import start_metrics_server
+from bot.webhook import ShardedUpdateQueue, check_webhook_config, create_webhook_app, update_user_id
+
+logger = logging.getLogger(__name__)
+
+
+def run_worker(index: int, updates: multiprocessing.Queue):
+    """Точка входа процесса-обработчика"""
+    # Ctrl+C и SIGTERM (systemd, KillMode=control-group) получает вся группа
+    # процессов; остановкой и дообработкой очередей управляет основной процесс
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    asyncio.run(_worker(index, updates))
+
+
+async def _worker(index: int, updates: multiprocessing.Queue):
+    """Обработчик своей доли обновлений со своими Dispatcher и APIClient"""
+    bot = Bot(token=Config.BOT_TOKEN)
+    metrics_runner = None
+    if Config.METRICS_PORT:
+        metrics_runner = await start_metrics_server(Config.METRICS_HOST, Config.METRICS_PORT + 1 + index)
+    # Рассылку ведет только первый процесс, иначе сообщения уйдут по нескольку раз
+    dp = await create_dispatcher(digest=index == 0)
+    lanes = ShardedUpdateQueue(Config.SHARD_LANES, Config.SHARD_QUEUE_SIZE)
+    loop = asyncio.get_running_loop()
+
+    async def process(update: Dict[str, Any], received_at: float):
+        await dp.feed_raw_update(bot, update, received_at=received_at)
+
+    workflow_data = {"dispatcher": dp, "bot": bot, **dp.workflow_data}
+    await dp.emit_startup(**workflow_data)
+    lanes.start(process)
+    logger.info(f"Worker {index} started")
+
+    try:
+        while True:
+            item = await loop.run_in_executor(None, updates.get)
+            if item is None:
+                break
+            received_at, update = item
+            await lanes.put(update, received_at)
+    finally:
+        await lanes.drain()
+        await dp.emit_shutdown(**workflow_data)
+        await bot.session.close()
+        if metrics_runner:
+            await metrics_runner.cleanup()
+        logger.info(f"Worker {index} stopped")
+
+
+class ProcessShardPool:
+    """Процессы-обработчики, между которыми обновления делятся по user id
+
+    Все обновления пользователя попадают в один процесс, поэтому его
+    состояние FSM и записи кэшей живут в одном месте, а порядок
+    обработки сохраняется.
+    """
+
+    # Как часто ожидание места в очереди проверяет, жив ли процесс, с
+    PUT_CHECK_INTERVAL = 1.0
+
+    def __init__(self, workers: int, maxsize: int):
+        self.context = multiprocessing.get_context("spawn")
+        self.queues = [self.context.Queue(maxsize=maxsize) for _ in range(workers)]
+        self.processes = [self._process(index) for index in range(workers)]
+        self._restart_lock = threading.Lock()
+
+    def _process(self, index: int) -> multiprocessing.Process:
+        return self.context.Process(target=run_worker, args=(index, self.queues[index]), name=f"bot-worker-{index}")
+
+    def start(self):
+        for process in self.processes:
+            process.start()
+
+    def _ensure_alive(self, index: int):
+        """Перезапустить упавший процесс; его очередь с необработанными обновлениями сохраняется"""
+        with self._restart_lock:
+            process = self.processes[index]
+            if process.is_alive():
+                return
+            logger.error(f"{process.name} died with exit code {process.exitcode}, restarting")
+            process = self._process(index)
+            process.start()
+            self.processes[index] = process
+
+    def _index_for(self, update: Dict[str, Any]) -> int:
+        return (update_user_id(update) or 0) % len(self.queues)
+
+    def put_nowait(self, update: Dict[str, Any], received_at: float = None):
+        index = self._index_for(update)
+        self._ensure_alive(index)
+        try:
+            self.queues[index].put_nowait((received_at or time.monotonic(), update))
+        except queue.Full:
+            raise asyncio.QueueFull from None
+
+    def _put_blocking(self, index: int, item, deadline: Optional[float] = None) -> bool:
+        """Положить в очередь; False - место не освободилось до deadline (time.monotonic)"""
+        # Ожидание с таймаутом: очередь упавшего процесса иначе не освободится никогда
+        while True:
+            self._ensure_alive(index)
+            timeout = self.PUT_CHECK_INTERVAL
+            if deadline is not None:
+                timeout = min(timeout, deadline - time.monotonic())
+            try:
+                if timeout > 0:
+                    self.queues[index].put(item, timeout=timeout)
+                else:
+                    self.queues[index].put_nowait(item)
+                return True
+            except queue.Full:
+                if timeout <= 0:
+                    return False
+
+    async def put(self, update: Dict[str, Any], received_at: float = None):
+        """Передать обновление процессу, дождавшись места в его очереди"""
+        item = (received_at or time.monotonic(), update)
+        await asyncio.get_running_loop().run_in_executor(None, self._put_blocking, self._index_for(update), item)
+
+    async def drain(self, timeout: Optional[float] = None):
+        """Остановить процессы после обработки уже переданных обновлений
+
+        Постановка сигнала остановки и ожидание процессов укладываются в
+        общий timeout; не успевшие процессы убиваются (SIGTERM они
+        игнорируют).
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for index in range(len(self.queues)):
+            if not await loop.run_in_executor(None, self._put_blocking, index, None, deadline):
+                logger.warning(f"{self.processes[index].name} queue is still full, skipping stop signal")
+        for process in self.processes:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            await loop.run_in_executor(None, process.join, remaining)
+            if process.is_alive():
+                logger.warning(f"{process.name} did not stop in time, killing")
+                process.kill()
+                await loop.run_in_executor(None, process.join)
+
+
+def resolve_update_types() -> List[str]:
+    """Типы обновлений, которые обрабатывают роутеры бота"""
+    dp = Dispatcher()
+    include_routers(dp)
+    return dp.resolve_used_update_types()
+
+
+async def _poll(bot: Bot, pool: ProcessShardPool, allowed_updates: List[str]):
+    offset = None
+    try:
+        while True:
+            try:
+                updates = await bot.get_updates(offset=offset, timeout=30, allowed_updates=allowed_updates)
+            except TelegramNetworkError as e:
+                logger.error(f"Polling error: {e}")
+                await asyncio.sleep(1)
+                continue
+            for update in updates:
+                # Смещение сдвигается до ожидания: put в пуле потоков завершится
+                # и при отмене ожидания, и обновление не должно прийти повторно
+                offset = update.update_id + 1
+                await pool.put(update.model_dump(mode="json", by_alias=True, exclude_none=True))
+    finally:
+        # Подтверждаем Telegram уже переданные обработчикам обновления
+        if offset is not None:
+            try:
+                await bot.get_updates(offset=offset, timeout=0, limit=1)
+            except TelegramNetworkError as e:
+                logger.error(f"Failed to confirm updates: {e}")
+
+
+async def run_sharded(bot: Bot):
+    """Основной процесс: получение обновлений и распределение по процессам"""
+    if Config.BOT_MODE == "webhook":
+        check_webhook_config()
+    pool = ProcessShardPool(Config.BOT_WORKERS, Config.SHARD_QUEUE_SIZE)
+    pool.start()
+
+    loop = asyncio.get_running_loop()
+    current = asyncio.current_task()
+    loop.add_signal_handler(signal.SIGTERM, current.cancel)
+
+    allowed_updates = resolve_update_types()
+    runner = None
+    try:
+        if Config.BOT_MODE == "webhook":
+            from aiohttp import web
+            runner = web.AppRunner(create_webhook_app(pool, Config.WEBHOOK_SECRET))
+            await runner.setup()
+            await web.TCPSite(runner, Config.WEBHOOK_HOST, Config.WEBHOOK_PORT).start()
+            await bot.set_webhook(
+                url=f"{Config.WEBHOOK_BASE_URL}{Config.WEBHOOK_PATH}",
+                secret_token=Config.WEBHOOK_SECRET,
+                allowed_updates=allowed_updates,
+            )
+            logger.info(f"Sharded webhook server started with {Config.BOT_WORKERS} workers")
+            await asyncio.Event().wait()
+        else:
+            await bot.delete_webhook()
+            logger.info(f"Sharded polling started with {Config.BOT_WORKERS} workers")
+            await _poll(bot, pool, allowed_updates)
+    finally:
+        if runner is not None:
+            await runner.cleanup()
+        logger.info("Draining workers...")
+        await pool.drain(timeout=Config.SHARD_DRAIN_TIMEOUT)
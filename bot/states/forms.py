@@ -8,6 +8,7 @@ class OvertimeForm(StatesGroup):
     employee = State()
     date = State()
     hours = State()
+    batch = State()
 
 class DocumentRequest(StatesGroup):
     select_date = State()
\ No newline at end of file
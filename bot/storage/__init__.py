@@ -0,0 +1,25 @@
+from aiogram.fsm.storage.base import BaseStorage
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from bot.config import Config
+
+
+def create_storage() -> BaseStorage:
+    """Хранилище FSM, выбранное в Config.FSM_STORAGE"""
+    if Config.FSM_STORAGE == "sqlite":
+        from bot.storage.sqlite import SQLiteStorage
+        return SQLiteStorage(
+            Config.FSM_STORAGE_PATH,
+            ttl=Config.FSM_STATE_TTL,
+            flush_interval=Config.FSM_FLUSH_INTERVAL,
+            batch_size=Config.FSM_FLUSH_BATCH_SIZE,
+            compaction_interval=Config.FSM_COMPACTION_INTERVAL,
+        )
+    if Config.FSM_STORAGE == "redis":
+        # Redis или совместимый по протоколу сервер; требует пакет redis
+        from aiogram.fsm.storage.redis import RedisStorage
+        return RedisStorage.from_url(Config.FSM_REDIS_URL, state_ttl=int(Config.FSM_STATE_TTL),
+                                     data_ttl=int(Config.FSM_STATE_TTL))
+    if Config.FSM_STORAGE != "memory":
+        raise ValueError(f"Unknown FSM_STORAGE: {Config.FSM_STORAGE}")
+    return MemoryStorage()
@@ -0,0 +1,223 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+
+logger = logging.getLogger(__name__)
+
+
+class _Record:
+    __slots__ = ("state", "data", "updated_at")
+
+    def __init__(self, state: Optional[str] = None, data: Dict[str, Any] = None, updated_at: float = 0.0):
+        self.state = state
+        self.data = data or {}
+        self.updated_at = updated_at
+
+    @property
+    def empty(self) -> bool:
+        return self.state is None and not self.data
+
+
+class SQLiteStorage(BaseStorage):
+    """Хранилище FSM в SQLite с кэшем в памяти и пакетной записью
+
+    Чтение обслуживается из памяти, изменения накапливаются и
+    сбрасываются в базу одной транзакцией раз в flush_interval секунд
+    или при накоплении batch_size изменений. Состояния, не менявшиеся
+    дольше ttl секунд, считаются брошенными и удаляются фоновой
+    задачей сжатия.
+    """
+
+    def __init__(
+            self,
+            path: str,
+            ttl: float = 24 * 3600,
+            flush_interval: float = 0.5,
+            batch_size: int = 200,
+            compaction_interval: float = 3600
+    ):
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.compaction_interval = compaction_interval
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS fsm_storage ("
+            " key TEXT PRIMARY KEY,"
+            " state TEXT,"
+            " data TEXT NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS fsm_storage_updated_at ON fsm_storage (updated_at)")
+        self._conn.commit()
+        self._db_lock = threading.Lock()
+
+        self._records: Dict[str, _Record] = {}
+        self._dirty: set = set()
+        self._flush_event: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @staticmethod
+    def _key(key: StorageKey) -> str:
+        return ":".join(str(part) for part in (
+            key.bot_id,
+            key.chat_id,
+            key.user_id,
+            getattr(key, "thread_id", None) or "",
+            getattr(key, "business_connection_id", None) or "",
+            key.destiny,
+        ))
+
+    def _start(self):
+        """Запуск фоновых задач при первом обращении из event loop"""
+        if self._tasks:
+            return
+        self._flush_event = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._flush_loop()),
+            asyncio.create_task(self._compaction_loop()),
+        ]
+
+    def _expired(self, record: _Record, now: float) -> bool:
+        return not record.empty and now - record.updated_at > self.ttl
+
+    async def _get(self, key: StorageKey) -> Tuple[str, _Record]:
+        self._start()
+        db_key = self._key(key)
+        record = self._records.get(db_key)
+        if record is None:
+            record = await asyncio.to_thread(self._select, db_key)
+            # Пока шел запрос, запись могла появиться
+            record = self._records.setdefault(db_key, record)
+
+        if self._expired(record, time.time()):
+            record.state, record.data = None, {}
+            self._mark_dirty(db_key)
+        return db_key, record
+
+    def _mark_dirty(self, db_key: str):
+        self._dirty.add(db_key)
+        if len(self._dirty) >= self.batch_size:
+            self._flush_event.set()
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        db_key, record = await self._get(key)
+        record.state = state.state if isinstance(state, State) else state
+        record.updated_at = time.time()
+        self._mark_dirty(db_key)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        _, record = await self._get(key)
+        return record.state
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        db_key, record = await self._get(key)
+        record.data = dict(data)
+        record.updated_at = time.time()
+        self._mark_dirty(db_key)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        _, record = await self._get(key)
+        return dict(record.data)
+
+    async def flush(self):
+        """Записать накопленные изменения в базу"""
+        if not self._dirty:
+            return
+        keys, self._dirty = self._dirty, set()
+        upserts = []
+        deletes = []
+        for db_key in keys:
+            record = self._records.get(db_key)
+            if record is None or record.empty:
+                deletes.append((db_key,))
+            else:
+                upserts.append((db_key, record.state, json.dumps(record.data), record.updated_at))
+        try:
+            await asyncio.to_thread(self._write, upserts, deletes)
+        except Exception:
+            # Не теряем изменения: попробуем снова при следующем сбросе
+            self._dirty |= keys
+            raise
+
+    async def compact(self):
+        """Удалить брошенные состояния из базы и из памяти"""
+        await self.flush()
+        now = time.time()
+        for db_key, record in list(self._records.items()):
+            if db_key in self._dirty:
+                continue
+            if record.empty or now - record.updated_at > self.ttl:
+                del self._records[db_key]
+        deleted = await asyncio.to_thread(self._delete_expired, now - self.ttl)
+        if deleted:
+            logger.info(f"FSM storage compaction: removed {deleted} expired states")
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"FSM storage flush error: {e}")
+
+    async def _compaction_loop(self):
+        while True:
+            await asyncio.sleep(self.compaction_interval)
+            try:
+                await self.compact()
+            except Exception as e:
+                logger.error(f"FSM storage compaction error: {e}")
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.flush()
+        with self._db_lock:
+            self._conn.close()
+
+    # === Синхронные операции с базой (выполняются в потоке) ===
+    def _select(self, db_key: str) -> _Record:
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT state, data, updated_at FROM fsm_storage WHERE key = ?", (db_key,)
+            ).fetchone()
+        if row is None:
+            return _Record()
+        state, data, updated_at = row
+        return _Record(state, json.loads(data), updated_at)
+
+    def _write(self, upserts: list, deletes: list):
+        with self._db_lock, self._conn:
+            if upserts:
+                self._conn.executemany(
+                    "INSERT INTO fsm_storage (key, state, data, updated_at) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT(key) DO UPDATE SET"
+                    " state = excluded.state, data = excluded.data, updated_at = excluded.updated_at",
+                    upserts,
+                )
+            if deletes:
+                self._conn.executemany("DELETE FROM fsm_storage WHERE key = ?", deletes)
+
+    def _delete_expired(self, before: float) -> int:
+        with self._db_lock:
+            with self._conn:
+                deleted = self._conn.execute("DELETE FROM fsm_storage WHERE updated_at < ?", (before,)).rowcount
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return deleted
@@ -0,0 +1,143 @@
+import asyncio
+import hmac
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from aiogram import Bot, Dispatcher
+from aiohttp import web
+
+from bot.config import Config
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def update_user_id(update: Dict[str, Any]) -> Optional[int]:
+    """Telegram ID пользователя (или чата) из сырого обновления"""
+    for key, value in update.items():
+        if key == "update_id" or not isinstance(value, dict):
+            continue
+        user = value.get("from") or value.get("user")
+        if user:
+            return user["id"]
+        chat = value.get("chat") or (value.get("message") or {}).get("chat")
+        if chat:
+            return chat["id"]
+    return None
+
+
+class ShardedUpdateQueue:
+    """Набор ограниченных очередей обновлений
+
+    Обновления одного пользователя всегда попадают в одну очередь и
+    обрабатываются по порядку; разные пользователи обрабатываются
+    параллельно. При переполнении put_nowait выбрасывает QueueFull.
+    """
+
+    def __init__(self, shards: int, maxsize: int):
+        self.queues = [asyncio.Queue(maxsize=max(1, maxsize // shards)) for _ in range(shards)]
+        self._workers: List[asyncio.Task] = []
+
+    def _queue_for(self, update: Dict[str, Any]) -> asyncio.Queue:
+        return self.queues[(update_user_id(update) or 0) % len(self.queues)]
+
+    def put_nowait(self, update: Dict[str, Any], received_at: float = None):
+        self._queue_for(update).put_nowait((received_at or time.monotonic(), update))
+
+    async def put(self, update: Dict[str, Any], received_at: float = None):
+        """Поставить обновление в очередь, дождавшись места"""
+        await self._queue_for(update).put((received_at or time.monotonic(), update))
+
+    def start(self, process: Callable[[Dict[str, Any], float], Awaitable[Any]]):
+        self._workers = [asyncio.create_task(self._work(queue, process)) for queue in self.queues]
+
+    @staticmethod
+    async def _work(queue: asyncio.Queue, process):
+        while True:
+            received_at, update = await queue.get()
+            try:
+                await process(update, received_at)
+            except Exception as e:
+                logger.exception(f"Failed to process update {update.get('update_id')}: {e}")
+            finally:
+                queue.task_done()
+
+    async def drain(self):
+        """Дождаться обработки принятых обновлений и остановить обработчики"""
+        await asyncio.gather(*(queue.join() for queue in self.queues))
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+
+def check_webhook_config():
+    """Режим webhook без секрета принимал бы поддельные обновления от кого угодно"""
+    if not Config.WEBHOOK_SECRET:
+        raise RuntimeError("WEBHOOK_SECRET is required in webhook mode")
+    if not Config.WEBHOOK_BASE_URL:
+        raise RuntimeError("WEBHOOK_BASE_URL is required in webhook mode")
+
+
+def create_webhook_app(queue, secret: str) -> web.Application:
+    """aiohttp приложение, принимающее обновления от Telegram
+
+    Принимаются только запросы с секретом, переданным Telegram при
+    установке webhook. Ответ отправляется сразу после постановки
+    обновления в очередь; если очередь заполнена, возвращается 503, и
+    Telegram повторит доставку позже.
+    """
+    if not secret:
+        raise ValueError("Webhook secret must not be empty")
+
+    async def handle(request: web.Request) -> web.Response:
+        if not hmac.compare_digest(request.headers.get(SECRET_HEADER, "").encode(), secret.encode()):
+            return web.Response(status=401)
+        try:
+            update = await request.json()
+        except ValueError:
+            return web.Response(status=400)
+        try:
+            queue.put_nowait(update)
+        except asyncio.QueueFull:
+            logger.warning("Update queue is full, asking Telegram to retry later")
+            return web.Response(status=503, headers={"Retry-After": "1"})
+        return web.Response()
+
+    app = web.Application()
+    app.router.add_post(Config.WEBHOOK_PATH, handle)
+    return app
+
+
+async def run_webhook(bot: Bot, dp: Dispatcher):
+    """Запуск бота в режиме webhook"""
+    check_webhook_config()
+    queue = ShardedUpdateQueue(Config.WEBHOOK_WORKERS, Config.WEBHOOK_QUEUE_SIZE)
+
+    async def process(update: Dict[str, Any], received_at: float):
+        await dp.feed_raw_update(bot, update, received_at=received_at)
+
+    workflow_data = {"dispatcher": dp, "bot": bot, **dp.workflow_data}
+    await dp.emit_startup(**workflow_data)
+    queue.start(process)
+
+    runner = web.AppRunner(create_webhook_app(queue, Config.WEBHOOK_SECRET))
+    await runner.setup()
+    site = web.TCPSite(runner, Config.WEBHOOK_HOST, Config.WEBHOOK_PORT)
+    await site.start()
+
+    await bot.set_webhook(
+        url=f"{Config.WEBHOOK_BASE_URL}{Config.WEBHOOK_PATH}",
+        secret_token=Config.WEBHOOK_SECRET,
+        allowed_updates=dp.resolve_used_update_types(),
+    )
+    logger.info(f"Webhook server listening on {Config.WEBHOOK_HOST}:{Config.WEBHOOK_PORT}{Config.WEBHOOK_PATH}")
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        # Перестаем принимать обновления и дорабатываем принятые
+        await runner.cleanup()
+        await queue.drain()
+        await dp.emit_shutdown(**workflow_data)
@@ -1,13 +1,12 @@
 import asyncio
 import logging
-from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram import Bot
 
 from bot.config import Config
-from bot.api_client import APIClient
-from bot.middlewares.auth_middleware import AuthMiddleware
-
-from bot.handlers import common, auth, employee_handler
+from bot.dispatcher import create_dispatcher
+from bot.metrics import start_metrics_server
+from bot.sharding import run_sharded
+from bot.webhook import run_webhook
 
 # Настройка логирования
 logging.basicConfig(
@@ -19,35 +18,34 @@ logger = logging.getLogger(__name__)
 
 async def main():
     """Главная функция"""
-    # Загружаем конфигурацию
-
-
-
     bot = Bot(token=Config.BOT_TOKEN)
-    dp = Dispatcher(storage=MemoryStorage())
-
-    api_client = APIClient(Config.API_URL)
-    await api_client.create_session()
-
-    # Регистрируем middleware
-    auth_middleware = AuthMiddleware(api_client)
-    dp.message.middleware(auth_middleware)
-    dp.callback_query.middleware(auth_middleware)
+    metrics_runner = None
+    if Config.METRICS_PORT:
+        metrics_runner = await start_metrics_server(Config.METRICS_HOST, Config.METRICS_PORT)
 
-    # Регистрируем роутеры
-    dp.include_router(auth.router)
-    dp.include_router(employee_handler.router)
-    dp.include_router(common.router)
+    if Config.BOT_WORKERS > 1:
+        try:
+            await run_sharded(bot)
+        finally:
+            await bot.session.close()
+            if metrics_runner:
+                await metrics_runner.cleanup()
+        return
 
-    # Добавляем api_client в контекст для всех хендлеров
-    dp.workflow_data.update(api_client=api_client)
+    dp = await create_dispatcher()
 
     try:
-        logger.info("Starting bot...")
-        await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
+        if Config.BOT_MODE == "webhook":
+            logger.info("Starting bot in webhook mode...")
+            await run_webhook(bot, dp)
+        else:
+            logger.info("Starting bot...")
+            await bot.delete_webhook()
+            await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
     finally:
-        await api_client.close_session()
         await bot.session.close()
+        if metrics_runner:
+            await metrics_runner.cleanup()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,169 @@
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+
+from bot.api_client import APIClient
+from bot.exceptions import APIUnavailableError, DocumentTooLargeError
+from bot.services.circuit_breaker import CircuitBreaker
+from bot.services.http_cache import HTTPCache
+
+
+async def start_backend(routes):
+    app = web.Application()
+    app.add_routes(routes)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def half_open(breaker: CircuitBreaker):
+    """Перевести автомат в состояние, когда следующий allow() пропустит пробный запрос"""
+    breaker.state = CircuitBreaker.OPEN
+    breaker.opened_at = time.monotonic() - breaker.reset_timeout - 1
+
+
+def test_half_open_probe_with_too_large_document_closes_breaker():
+    async def scenario():
+        async def document(request):
+            return web.Response(body=b"x" * 1024)
+
+        runner, url = await start_backend([web.post("/documents/holiday/{action_id}", document)])
+        client = APIClient(url)
+        await client.create_session()
+        client.max_document_size = 100
+        half_open(client.breaker)
+        try:
+            with pytest.raises(DocumentTooLargeError):
+                await client.get_holiday_document_by_action(1)
+            # Пробный запрос завершен: автомат не должен остаться заблокированным
+            assert client.breaker.state == CircuitBreaker.CLOSED
+            assert client.breaker.allow()
+        finally:
+            await client.close_session()
+            await runner.cleanup()
+
+    asyncio.run(scenario())
+
+
+def test_retries_count_as_one_failure():
+    async def scenario():
+        async def broken(request):
+            return web.Response(status=503, text="down")
+
+        runner, url = await start_backend([web.get("/employees/{employee_id}", broken)])
+        client = APIClient(url)
+        await client.create_session()
+        client.retries = 2
+        client._backoff = lambda attempt: 0
+        try:
+            with pytest.raises(APIUnavailableError):
+                await client.get_employee_info(1)
+            assert client.breaker.failures == 1
+            assert client.breaker.state == CircuitBreaker.CLOSED
+        finally:
+            await client.close_session()
+            await runner.cleanup()
+
+    asyncio.run(scenario())
+
+
+def test_not_modified_without_cached_response_refetches():
+    async def scenario():
+        async def employee(request):
+            # Backend отвечает 304 на любой условный запрос
+            if "If-None-Match" in request.headers:
+                return web.Response(status=304, headers={"ETag": '"v1"'})
+            return web.json_response({"employee_id": 1, "surname": "Иванов"}, headers={"ETag": '"v1"'})
+
+        runner, url = await start_backend([web.get("/employees/{employee_id}", employee)])
+        client = APIClient(url, http_cache=HTTPCache())
+        await client.create_session()
+        try:
+            data = await client._request("GET", "/employees/1", headers={"If-None-Match": '"v1"'})
+            assert data == {"employee_id": 1, "surname": "Иванов"}
+            assert client.http_cache.misses == 1
+        finally:
+            await client.close_session()
+            await runner.cleanup()
+
+    asyncio.run(scenario())
+
+
+def test_created_action_keeps_employee_list_cached():
+    async def scenario():
+        requests = []
+
+        async def employees(request):
+            requests.append(request.path)
+            if request.headers.get("If-None-Match") == '"list"':
+                return web.Response(status=304, headers={"ETag": '"list"', "Cache-Control": "max-age=60"})
+            return web.json_response([{"employee_id": 1}], headers={"ETag": '"list"', "Cache-Control": "max-age=60"})
+
+        async def actions(request):
+            requests.append(request.path)
+            return web.json_response([], headers={"ETag": '"actions"', "Cache-Control": "max-age=60"})
+
+        async def create(request):
+            return web.json_response({"action_id": 1}, status=201)
+
+        runner, url = await start_backend([
+            web.get("/employees", employees),
+            web.get("/employees/{employee_id}/actions", actions),
+            web.post("/actions", create),
+        ])
+        client = APIClient(url, http_cache=HTTPCache())
+        await client.create_session()
+        try:
+            await client._request("GET", "/employees")
+            await client._request("GET", "/employees/1/actions")
+            await client.create_overtime(1, 4, "2026-10-17")
+            await client._request("GET", "/employees")
+            await client._request("GET", "/employees/1/actions")
+            # Список сотрудников отдан из кэша, действия сотрудника загружены заново
+            assert requests == ["/employees", "/employees/1/actions", "/employees/1/actions"]
+        finally:
+            await client.close_session()
+            await runner.cleanup()
+
+    asyncio.run(scenario())
+
+
+def test_get_after_write_does_not_join_earlier_get():
+    async def scenario():
+        actions = [{"action_id": 1}]
+        first_get_started = asyncio.Event()
+
+        async def list_actions(request):
+            body = list(actions)
+            first_get_started.set()
+            # Ответ, прочитанный до записи, приходит после нее
+            await asyncio.sleep(0.2)
+            return web.json_response(body)
+
+        async def create(request):
+            actions.append({"action_id": 2})
+            return web.json_response({"action_id": 2}, status=201)
+
+        runner, url = await start_backend([
+            web.get("/employees/{employee_id}/actions", list_actions),
+            web.post("/actions", create),
+        ])
+        client = APIClient(url)
+        await client.create_session()
+        try:
+            before = asyncio.create_task(client._request("GET", "/employees/1/actions"))
+            await first_get_started.wait()
+            await client.create_overtime(1, 4, "2026-10-17")
+            after = await client._request("GET", "/employees/1/actions")
+            assert len(await before) == 1
+            assert after == [{"action_id": 1}, {"action_id": 2}]
+        finally:
+            await client.close_session()
+            await runner.cleanup()
+
+    asyncio.run(scenario())
@@ -0,0 +1,127 @@
+import asyncio
+from html.parser import HTMLParser
+
+import aiohttp
+from aiohttp.client_reqrep import ConnectionKey
+
+from bot.exceptions import APIUnavailableError, CircuitOpenError
+from bot.handlers.admin import batch_report
+from bot.models import Employee
+from bot.services.bulk_overtime import EmployeeResolver, OvertimeRow, parse_table, submit_rows
+
+
+def make_resolver() -> EmployeeResolver:
+    return EmployeeResolver([
+        Employee.from_dict({"employee_id": 1, "surname": "Иванов", "name": "Иван", "login": "ivanov"}),
+    ])
+
+
+class TextCollector(HTMLParser):
+    """Теги и текст сообщения, как их увидит разбор parse_mode=HTML"""
+
+    def __init__(self):
+        super().__init__()
+        self.tags = []
+        self.text = ""
+
+    def handle_starttag(self, tag, attrs):
+        self.tags.append(tag)
+
+    def handle_data(self, data):
+        self.text += data
+
+
+def test_report_escapes_user_input():
+    rows = parse_table(
+        "ivanov; 2026-10-17; 4\n"
+        "<b; 2026-10-17; 4\n"
+        "ivanov; 17.10.2026 & later; 4\n"
+        "ivanov; 2026-10-18; <i>8\n",
+        make_resolver(),
+    )
+    assert [row.line for row in rows if row.error] == [2, 3, 4]
+
+    report = batch_report(rows)
+    assert "«&lt;b»" in report
+    assert "«17.10.2026 &amp; later»" in report
+    assert "«&lt;i&gt;8»" in report
+    # Из разметки в отчете только заголовок, ввод пользователя виден как текст
+    parsed = TextCollector()
+    parsed.feed(report)
+    parsed.close()
+    assert parsed.tags == ["b"]
+    assert "«<b»" in parsed.text
+    assert "«<i>8»" in parsed.text
+
+
+def test_report_is_bounded():
+    text = "\n".join(f"<unknown {index}>; 2026-10-17; 4" for index in range(1000))
+    report = batch_report(parse_table(text, make_resolver()))
+    assert len(report) <= 4000
+    assert report.endswith("…")
+
+
+def test_line_numbers_count_blank_lines():
+    rows = parse_table(
+        "сотрудник; дата; часы\n"
+        "\n"
+        "ivanov; 2026-10-17; 4\n"
+        "   \n"
+        "petrov; 2026-10-17; 4\n",
+        make_resolver(),
+    )
+    assert [(row.line, row.error is None) for row in rows] == [(3, True), (5, False)]
+
+
+class FailingClient:
+    """create_overtime, выбрасывающий заданные ошибки по очереди"""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def create_overtime(self, employee_id, hours, date):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return {"action_id": self.calls}
+
+
+def connect_error() -> APIUnavailableError:
+    try:
+        raise APIUnavailableError("connect") from aiohttp.ClientConnectorError(
+            ConnectionKey("backend", 80, False, True, None, None, None), OSError("refused")
+        )
+    except APIUnavailableError as e:
+        return e
+
+
+def read_timeout() -> APIUnavailableError:
+    try:
+        raise APIUnavailableError("timeout") from asyncio.TimeoutError()
+    except APIUnavailableError as e:
+        return e
+
+
+def submit(client) -> OvertimeRow:
+    rows = parse_table("ivanov; 2026-10-17; 4", make_resolver())
+    asyncio.run(submit_rows(client, rows, retries=2))
+    return rows[0]
+
+
+def test_unsent_requests_are_retried():
+    client = FailingClient([connect_error(), CircuitOpenError("open")])
+    row = submit(client)
+    assert row.error is None
+    assert client.calls == 3
+
+
+def test_request_that_may_have_reached_backend_is_not_retried():
+    client = FailingClient([read_timeout()])
+    row = submit(client)
+    assert row.error == "результат неизвестен, проверьте вручную"
+    assert client.calls == 1
+
+    client = FailingClient([APIUnavailableError("API Error: 502", status=502)])
+    assert submit(client).error == "результат неизвестен, проверьте вручную"
+    assert client.calls == 1
@@ -0,0 +1,111 @@
+import asyncio
+import time
+
+from aiogram import Bot, Dispatcher, F
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import AnswerCallbackQuery
+from aiogram.types import CallbackQuery
+
+from bot.middlewares.throttling_middleware import ThrottlingMiddleware
+from bot.webhook import ShardedUpdateQueue
+
+
+class RecordingSession(BaseSession):
+    """Сессия без сети: запоминает вызванные методы Bot API"""
+
+    def __init__(self):
+        super().__init__()
+        self.requests = []
+
+    async def make_request(self, bot, method, timeout=None):
+        self.requests.append(method)
+        return True
+
+    async def stream_content(self, *args, **kwargs):
+        yield b""
+
+    async def close(self):
+        pass
+
+
+def callback_update(update_id: int, user_id: int, data: str) -> dict:
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "from": {"id": user_id, "is_bot": False, "first_name": "Test"},
+            "chat_instance": "1",
+            "data": data,
+        },
+    }
+
+
+def make_dispatcher(calls: list, duplicate_window: float) -> Dispatcher:
+    dp = Dispatcher()
+    throttling_middleware = ThrottlingMiddleware({"default": (100, 100)}, duplicate_window=duplicate_window)
+    dp.callback_query.middleware(throttling_middleware)
+
+    @dp.callback_query(F.data)
+    async def handler(callback: CallbackQuery):
+        calls.append(callback.data)
+        await asyncio.sleep(0.05)
+
+    return dp
+
+
+def run_through_queue(updates, duplicate_window: float, pause: float = 0.0):
+    """Прогнать обновления через ShardedUpdateQueue, как в режиме webhook"""
+    async def scenario():
+        calls = []
+        session = RecordingSession()
+        bot = Bot("42:TEST", session=session)
+        dp = make_dispatcher(calls, duplicate_window)
+        queue = ShardedUpdateQueue(shards=4, maxsize=100)
+
+        async def process(update, received_at):
+            await dp.feed_raw_update(bot, update, received_at=received_at)
+
+        queue.start(process)
+        for update in updates:
+            queue.put_nowait(update, time.monotonic())
+            if pause:
+                await queue.drain()
+                await asyncio.sleep(pause)
+                queue.start(process)
+        await queue.drain()
+        answers = [method for method in session.requests if isinstance(method, AnswerCallbackQuery)]
+        return calls, answers
+
+    return asyncio.run(scenario())
+
+
+def test_repeated_press_is_dropped_with_ordered_queue():
+    # Повтор доходит до хендлера только после завершения первого нажатия
+    calls, answers = run_through_queue(
+        [callback_update(1, 10, "stats:month"), callback_update(2, 10, "stats:month")],
+        duplicate_window=1.0,
+    )
+    assert calls == ["stats:month"]
+    assert len(answers) == 1
+
+
+def test_other_button_and_other_user_are_not_dropped():
+    calls, _ = run_through_queue(
+        [
+            callback_update(1, 10, "stats:month"),
+            callback_update(2, 10, "stats:year"),
+            callback_update(3, 11, "stats:month"),
+        ],
+        duplicate_window=1.0,
+    )
+    assert sorted(calls) == ["stats:month", "stats:month", "stats:year"]
+
+
+def test_press_after_window_is_handled():
+    calls, answers = run_through_queue(
+        [callback_update(1, 10, "stats:month"), callback_update(2, 10, "stats:month")],
+        duplicate_window=0.1,
+        pause=0.2,
+    )
+    assert calls == ["stats:month", "stats:month"]
+    assert answers == []
@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from bot.config import Config
+from bot.webhook import SECRET_HEADER, ShardedUpdateQueue, check_webhook_config, create_webhook_app
+
+UPDATE = {"update_id": 1, "message": {"message_id": 1, "date": 0, "chat": {"id": 10, "type": "private"}}}
+
+
+def test_webhook_rejects_requests_without_secret():
+    async def scenario():
+        queue = ShardedUpdateQueue(shards=1, maxsize=10)
+        client = TestClient(TestServer(create_webhook_app(queue, "s3cret")))
+        await client.start_server()
+        try:
+            for headers in ({}, {SECRET_HEADER: "wrong"}, {SECRET_HEADER: "секрет"}):
+                response = await client.post(Config.WEBHOOK_PATH, json=UPDATE, headers=headers)
+                assert response.status == 401
+            assert queue.queues[0].empty()
+
+            response = await client.post(Config.WEBHOOK_PATH, json=UPDATE, headers={SECRET_HEADER: "s3cret"})
+            assert response.status == 200
+            assert queue.queues[0].qsize() == 1
+        finally:
+            await client.close()
+
+    asyncio.run(scenario())
+
+
+def test_webhook_mode_requires_secret_and_url(monkeypatch):
+    monkeypatch.setattr(Config, "WEBHOOK_SECRET", None)
+    monkeypatch.setattr(Config, "WEBHOOK_BASE_URL", "https://bot.example.com")
+    with pytest.raises(RuntimeError):
+        check_webhook_config()
+    with pytest.raises(ValueError):
+        create_webhook_app(ShardedUpdateQueue(shards=1, maxsize=10), None)
+
+    monkeypatch.setattr(Config, "WEBHOOK_SECRET", "s3cret")
+    monkeypatch.setattr(Config, "WEBHOOK_BASE_URL", None)
+    with pytest.raises(RuntimeError):
+        check_webhook_config()